@@ -0,0 +1 @@
+# Lets the tests import the `ragcv` package when pytest is run from backend/
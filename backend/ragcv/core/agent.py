@@ -1,9 +1,24 @@
+import json
+import uuid
+import hashlib
+import threading
+
+from collections import OrderedDict
+from concurrent.futures import Future
 from typing import Any, List, Optional, Dict, Tuple, Sequence, Type
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import ToolMessage
 from pydantic import BaseModel
 from langchain_openai import ChatOpenAI
 
+# Responses are only reused for (near-)deterministic agents
+CACHE_MAX_TEMPERATURE = 0.3
+CACHE_MAX_ENTRIES = 256
+
+_response_cache: "OrderedDict[str, Tuple[Any, Any]]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+_inflight: Dict[str, Future] = {}
+
 class Agent:
     def __init__(
         self,
@@ -19,8 +34,12 @@ class Agent:
         self.name = name
         self.prompt = prompt
         self.output_parser = output_parser
+        self.model_name = model_name
+        self.temperature = temperature
+        self.use_cache = temperature <= CACHE_MAX_TEMPERATURE
 
         self.tools = tools or []
+        self.tool_map = {t.name: t for t in self.tools}
         self.chain = None
         self.tool_chain = None
 
@@ -29,7 +48,9 @@ class Agent:
             model=model_name,
             temperature=temperature,
             top_p=top_p,
-            streaming=True
+            streaming=True,
+            # Streamed responses only carry token usage (incl. cached prompt tokens) when asked for
+            stream_usage=True
         )
         
         if self.tools:
@@ -45,13 +66,68 @@ class Agent:
 
     def invoke(self, input_data: Dict[str, Any], callbacks = None) -> Dict[str, Any]:
 
+        cache_key = self._cache_key(input_data) if self.use_cache else None
+        if cache_key is None:
+            return self._run(input_data, callbacks)
+
+        with _response_cache_lock:
+            cached = _response_cache.get(cache_key)
+            if cached is not None:
+                _response_cache.move_to_end(cache_key)
+            else:
+                # An identical request already in flight (e.g. from a parallel run) is awaited, not repeated
+                pending = _inflight.get(cache_key)
+                if pending is None:
+                    owned = _inflight[cache_key] = Future()
+
+        if cached is not None:
+            self._record_reuse(callbacks, "cache")
+            return cached
+        if pending is not None:
+            response = pending.result()
+            self._record_reuse(callbacks, "coalesced")
+            return response
+
+        try:
+            response = self._run(input_data, callbacks)
+        except BaseException as e:
+            # Any failure, including cancellation, is handed to the waiters rather than leaving them blocked
+            owned.set_exception(e)
+            raise
+        else:
+            with _response_cache_lock:
+                _response_cache[cache_key] = response
+                if len(_response_cache) > CACHE_MAX_ENTRIES:
+                    _response_cache.popitem(last=False)
+            owned.set_result(response)
+        finally:
+            with _response_cache_lock:
+                _inflight.pop(cache_key, None)
+
+        return response
+
+    def _run(self, input_data: Dict[str, Any], callbacks = None) -> Tuple[Any, Any]:
         tool_result = None
-        
+
         if self.tool_chain:
             tool_result = self.tool_chain.invoke(input_data)
-            
+
         config = {"callbacks": [callbacks()]} if callbacks else {}
         result = self.chain.invoke(input_data, config=config)
 
         return result, tool_result
-            
+
+    @staticmethod
+    def _record_reuse(callbacks, source: str) -> None:
+        """A reused response makes no LLM call; tell the caller's handler so its metrics still record the call."""
+        if callbacks:
+            callbacks().on_custom_event("response_reused", {"source": source}, run_id=uuid.uuid4())
+
+    def _cache_key(self, input_data: Dict[str, Any]) -> str:
+        """Hash of everything that determines the response for this agent."""
+        payload = json.dumps(
+            [self.name, self.model_name, input_data],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
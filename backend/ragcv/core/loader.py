@@ -1,10 +1,17 @@
 # This file will parse the data in data/ and process it into a format that can be used by the pipeline (FAISS vector database)
 import os
 import re
-import json
+import uuid
 
-from copy import deepcopy
-from typing import List
+import faiss
+import httpx
+import orjson
+import numpy as np
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
 
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.document_loaders import (
@@ -14,15 +21,57 @@ from langchain_community.document_loaders import (
 )
 from langchain_core.documents import Document
 from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
 
 from ..retrieval.chunking import (
-    token_count,
+    token_counts,
     CVSemanticChunker,
     CoverLetterChunker,
     chunk_notes,
     default_chunker
 )
 
+# Inputs per embeddings request, and how many requests are in flight at once
+EMBED_BATCH_SIZE = 256
+EMBED_MAX_WORKERS = 8
+LOAD_MAX_WORKERS = 8
+
+# Below this many chunks an exact flat index is both faster and exact
+ANN_MIN_VECTORS = 10000
+HNSW_M = 32
+# Graph build and search beam widths; faiss's defaults (40, 16) leave efSearch barely above base_k
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 128
+
+def build_faiss_index(xb: np.ndarray) -> faiss.Index:
+    """Exact flat index for small corpora; HNSW above ANN_MIN_VECTORS, which needs no training step."""
+    dim = xb.shape[1]
+
+    if len(xb) >= ANN_MIN_VECTORS:
+        index = faiss.IndexHNSWFlat(dim, HNSW_M)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+    else:
+        index = faiss.IndexFlatL2(dim)
+    index.add(xb)
+    return index
+
+# Process-wide cache of the loaded index, keyed on DataLoader.vectorstore_cache_key()
+_vectorstore_cache: Dict[Tuple[str, float], FAISS] = {}
+
+@lru_cache(maxsize=1)
+def get_embeddings() -> OpenAIEmbeddings:
+    """Process-wide embeddings client, so every caller shares one HTTP connection pool."""
+    return OpenAIEmbeddings(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        chunk_size=EMBED_BATCH_SIZE,
+        max_retries=6,
+        request_timeout=60,
+        http_client=httpx.Client(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=64)
+        ),
+    )
+
 class DataLoader():
     def __init__(
         self, 
@@ -31,7 +80,7 @@ class DataLoader():
         chunk_size: int = 1024, 
         chunk_overlap: int = 256 
     ):
-        self.data_path = data_path
+        self.data_path = os.fspath(data_path)
         self.db_path = db_path
         self.loaders = None
         self.documents = None
@@ -42,23 +91,24 @@ class DataLoader():
         self.cv_chunker = CVSemanticChunker(max_tokens=self.chunk_size)
         self.cl_chunker = CoverLetterChunker()
 
-        self.cv_folder_path = os.path.join(data_path, "CVs")
-        self.cl_folder_path = os.path.join(data_path, "CoverLetters")
-        self.notes_folder_path = os.path.join(data_path, "Notes")
+        self.cv_folder_path = os.path.join(self.data_path, "CVs")
+        self.cl_folder_path = os.path.join(self.data_path, "CoverLetters")
+        self.notes_folder_path = os.path.join(self.data_path, "Notes")
 
         self.load()
 
     def load(self):
         # Load the data
-        num_files = 0
-        for folder in [self.cv_folder_path, self.cl_folder_path, self.notes_folder_path]:
-            if os.path.exists(folder):
-                num_files += len([f for f in os.listdir(folder) if os.path.isfile(os.path.join(folder, f))])
+        cv_files = _scan(self.cv_folder_path)
+        cl_files = _scan(self.cl_folder_path)
+        notes_files = _scan(self.notes_folder_path)
+
+        num_files = len(cv_files) + len(cl_files) + len(notes_files)
         print(f"{'='*60}\nLoading data from {num_files} files\n{'='*60}")
         if self.loaders is None:
-            cv_loaders = [self.create_loader(f, self.cv_folder_path) for f in os.listdir(self.cv_folder_path)]
-            cl_loaders = [self.create_loader(f, self.cl_folder_path) for f in os.listdir(self.cl_folder_path)]
-            notes_loaders = [self.create_loader(f, self.notes_folder_path) for f in os.listdir(self.notes_folder_path)]
+            cv_loaders = [self.create_loader(f, self.cv_folder_path) for f in cv_files]
+            cl_loaders = [self.create_loader(f, self.cl_folder_path) for f in cl_files]
+            notes_loaders = [self.create_loader(f, self.notes_folder_path) for f in notes_files]
 
             if self.documents is None:
                 self.all_cvs = []
@@ -83,8 +133,13 @@ class DataLoader():
                 }
             ]
 
-        for cat in self.documents:
-              compile_docs(cat["loaders"], cat["folder"], cat["type"])
+        # Parse all files across categories concurrently, then file them in order
+        jobs = [(cat, loader) for cat in self.documents for loader in cat["loaders"]]
+        with ThreadPoolExecutor(max_workers=LOAD_MAX_WORKERS) as executor:
+            loaded = list(executor.map(lambda job: job[1].load(), jobs))
+
+        for (cat, _), documents in zip(jobs, loaded):
+            compile_docs(documents, cat["folder"], cat["type"])
 
         self.all_files = [doc.metadata["source"] for doc in self.all_cvs + self.all_cls + self.all_notes]
         return
@@ -120,33 +175,27 @@ class DataLoader():
     def db_similarity(self):
         current_metadata = self.generate_db_metadata()
         try:
-            with open(os.path.join(self.db_path, "metadata.json"), "r", encoding="utf-8") as f:
-                previous_metadata = json.load(f)
-            for key, value in current_metadata.items():
-                if key not in previous_metadata:
-                    return False
-                elif current_metadata[key] != previous_metadata[key]:
-                    return False
-
+            previous_metadata = orjson.loads(Path(self.db_path, "metadata.json").read_bytes())
         except FileNotFoundError:
             return False
 
-        return True
+        return current_metadata == previous_metadata
 
     def build_vectorstore(self, embeddings: OpenAIEmbeddings | None = None):    
         print(f"{'='*60}\nBuilding Vectorstore")
 
         if embeddings is None:
-            embeddings = OpenAIEmbeddings(api_key=os.getenv("OPENAI_API_KEY"))
-        all_docs = []
+            embeddings = get_embeddings()
+        texts: List[str] = []
+        metadatas: List[dict] = []
 
         for docs in self.documents:
             doc_type = docs['type']
 
             for doc in docs['folder']:
                 content = doc.page_content
-                metadata = deepcopy(doc.metadata)
-                metadata["doc_type"] = doc_type
+                # Flat dict of scalars (doc_type already set by compile_docs); each chunk gets its own copy below
+                metadata = doc.metadata
                 doc_source = metadata.get("source")
                 
                 processed_chunks = []
@@ -162,52 +211,120 @@ class DataLoader():
                     chunks = default_chunker(content)
                     processed_chunks = [{"text": c, "metadata": {}} for c in chunks]
 
-                doc_chunks = [
-                    Document(
-                        page_content=chunk_data["text"],
-                        metadata={
-                            **metadata,           # Original file metadata
-                            **chunk_data["metadata"], # Semantic metadata (company, dates, etc.)
-                            "chunk_length_tokens": token_count(chunk_data["text"]),
-                        }
-                    )
+                texts.extend(chunk_data["text"] for chunk_data in processed_chunks)
+                metadatas.extend(
+                    {
+                        **metadata,           # Original file metadata
+                        **chunk_data["metadata"], # Semantic metadata (company, dates, etc.)
+                    }
                     for chunk_data in processed_chunks
-                ]
-                all_docs.extend(doc_chunks)
+                )
 
-        vectorstore = FAISS.from_documents(all_docs, embeddings)
+        # One token count over the whole corpus, so it is large enough for the batched encoder
+        for chunk_metadata, n_tokens in zip(metadatas, token_counts(texts)):
+            chunk_metadata["chunk_length_tokens"] = n_tokens
+
+        vectors = self.embed_documents(texts, embeddings)
+        vectorstore = self.build_index(texts, metadatas, vectors, embeddings)
         vectorstore.save_local(self.db_path)
 
         metadata_path = os.path.join(self.db_path, "metadata.json")
         db_metadata = self.generate_db_metadata()
 
-        with open(metadata_path, "w", encoding="utf-8") as f:
-            json.dump(db_metadata, f, indent=4)
+        with open(metadata_path, "wb") as f:
+            f.write(orjson.dumps(db_metadata, option=orjson.OPT_INDENT_2))
 
         print("-- Success\n","="*60)
         return vectorstore
 
-    def load_vectorstore(self, embeddings):
+    def build_index(
+        self, 
+        texts: List[str], 
+        metadatas: List[dict], 
+        vectors: List[List[float]], 
+        embeddings: OpenAIEmbeddings
+    ) -> FAISS:
+        """
+        Wraps precomputed vectors in a FAISS vectorstore. Small corpora use an exact flat
+        index; larger ones switch to HNSW, built and searched with beams wide enough for base_k.
+        """
+        index = build_faiss_index(np.asarray(vectors, dtype=np.float32))
+
+        # Documents are only materialised for the docstore the retriever reads from
+        ids = [str(uuid.uuid4()) for _ in texts]
+        docstore = InMemoryDocstore({
+            doc_id: Document(page_content=text, metadata=metadata)
+            for doc_id, text, metadata in zip(ids, texts, metadatas)
+        })
+        return FAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=dict(enumerate(ids)),
+        )
+
+    def embed_documents(self, texts: List[str], embeddings: OpenAIEmbeddings) -> List[List[float]]:
+        """
+        Embed texts in concurrent batches. Texts are sorted by length first so each 
+        batch holds similarly sized inputs; vectors are returned in the original order.
+        """
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        batches = [order[i:i + EMBED_BATCH_SIZE] for i in range(0, len(order), EMBED_BATCH_SIZE)]
+
+        with ThreadPoolExecutor(max_workers=EMBED_MAX_WORKERS) as executor:
+            batch_vectors = executor.map(
+                lambda batch: embeddings.embed_documents([texts[i] for i in batch]),
+                batches
+            )
+
+            vectors = [None] * len(texts)
+            for batch, result in zip(batches, batch_vectors):
+                for i, vector in zip(batch, result):
+                    vectors[i] = vector
+        return vectors
+
+    def load_vectorstore(self, embeddings: OpenAIEmbeddings | None = None):
+        if embeddings is None:
+            embeddings = get_embeddings()
+
         if not self.db_similarity():
             vectorstore = self.build_vectorstore(embeddings=embeddings)
         else:
+            cache_key = self.vectorstore_cache_key()
+            vectorstore = _vectorstore_cache.get(cache_key)
+            if vectorstore is not None:
+                print("\n[Corpus unchanged, reusing in-memory vectorstore.]\n")
+                return vectorstore
+
             print("\n[Corpus unchanged since last build, loading existing vectorstore.]\n")
             vectorstore = FAISS.load_local(
                     self.db_path,
                     embeddings,
                     allow_dangerous_deserialization=True
             )
+
+        # Keep only the most recent index in memory
+        _vectorstore_cache.clear()
+        _vectorstore_cache[self.vectorstore_cache_key()] = vectorstore
         return vectorstore
+
+    def vectorstore_cache_key(self) -> Tuple[str, float]:
+        """Identifies the saved index on disk; a rebuild changes the index file's mtime."""
+        index_path = os.path.join(self.db_path, "index.faiss")
+        return os.path.abspath(self.db_path), os.path.getmtime(index_path)
     
-def compile_docs(loaders, folder: List[Document], doc_type: str):
-    for loader in loaders:
-        documents = loader.load()
-        for doc in documents:
-            doc.metadata = dict(doc.metadata)
-            doc.metadata["doc_type"] = doc_type
-        folder.extend(documents)
-        if isinstance(documents, list) and all(isinstance(d, Document) for d in documents):
-            print("\t * Loaded doc from:", documents[0].metadata["source"])
-        else:
-            print("\t * Error loading:", documents[0].metadata["source"])
+def _scan(folder: str) -> List[str]:
+    """Names of the regular files in folder, from a single directory read."""
+    with os.scandir(folder) as entries:
+        return [entry.name for entry in entries if entry.is_file()]
+
+def compile_docs(documents: List[Document], folder: List[Document], doc_type: str):
+    for doc in documents:
+        doc.metadata = dict(doc.metadata)
+        doc.metadata["doc_type"] = doc_type
+    folder.extend(documents)
+    if isinstance(documents, list) and all(isinstance(d, Document) for d in documents):
+        print("\t * Loaded doc from:", documents[0].metadata["source"])
+    else:
+        print("\t * Error loading:", documents[0].metadata["source"])
 
@@ -1,143 +1,146 @@
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Type
+
+from langchain_core.messages import BaseMessage, SystemMessage
 from langchain_core.prompts import(
     ChatPromptTemplate,
     HumanMessagePromptTemplate,
     AIMessagePromptTemplate,
-    SystemMessagePromptTemplate
 )
 
-from ..workflows.prompts.cover_letter_prompts import * 
-from ..workflows.prompts.cv_prompts import * 
-from ..workflows.prompts.system_prompts import * 
+from ..workflows.prompts.cover_letter_prompts import *
+from ..workflows.prompts.cv_prompts import *
+from ..workflows.prompts.system_prompts import *
+from ..retrieval.chunking import token_count
+
+# Outer system message shared by every agent; the output contract is stated here once
+_SYSTEM_FRAME = SystemPrompt + GLOBAL_JSON_CONTRACT
+
+# OpenAI only serves a prompt prefix from its cache once it reaches this many tokens
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+# Each spec is (messages, input_variables), where messages are (message or template class, text).
+# Messages are layered from most to least stable so the provider's automatic prompt-prefix
+# cache covers as much as possible: the shared SystemPrompt, then the agent's own instructions,
+# then per-job context (retrieved documents, job description), and last the inputs that change
+# on every turn of a QC retry loop (blueprint, critique, draft)
+_PROMPT_SPECS: Dict[str, Tuple[List[Tuple[Type, str]], List[str]]] = {
+    "Summary_Agent": (
+        [
+            (SystemMessage, _SYSTEM_FRAME),
+            (SystemMessage, SummaryPrompt),
+            (HumanMessagePromptTemplate, "Input job description: {job_description}"),
+        ],
+        ['job_description'],
+    ),
+
+    "Semantic_Alignment_Agent": (
+        [
+            (SystemMessage, _SYSTEM_FRAME),
+            (SystemMessage, SemanticAlignmentAgentPrompt),
+            (HumanMessagePromptTemplate, "Input job description summary: {summary}"),
+        ],
+        ['summary'],
+    ),
+
+    # COVER LETTER PATHWAY
+    "CL_Task_Agent": (
+        [
+            (SystemMessage, _SYSTEM_FRAME),
+            (SystemMessage, CoverLetterTaskPrompt),
+            (HumanMessagePromptTemplate, "Retrieved Documents (Background information):\n{retrieved_documents}"),
+            (AIMessagePromptTemplate, "Input from previous agent:\n{task_agent_input}"),
+        ],
+        ['task_agent_input', 'retrieved_documents'],
+    ),
+
+    "CL_Agent": (
+        [
+            (SystemMessage, _SYSTEM_FRAME),
+            (SystemMessage, CoverLetterWriterPrompt),
+            (AIMessagePromptTemplate, "Input blueprint from task agent: {blueprint}"),
+            (HumanMessagePromptTemplate, "Revision request:\n{revision_request}"),
+        ],
+        ['blueprint', 'revision_request'],
+    ),
+
+    "Quality_Checker_Agent": (
+        [
+            (SystemMessage, _SYSTEM_FRAME),
+            (SystemMessage, CoverLetterQualityCheckerPrompt),
+            (
+                HumanMessagePromptTemplate,
+                "Retrieved Documents (Background information):\n{retrieved_documents}\n\n"
+                "Job description for this task:\n{job_description}"
+            ),
+            (AIMessagePromptTemplate, "Writing strategy blueprint:\n{blueprint}"),
+            (HumanMessagePromptTemplate, "Candidate cover letter to be evaluated:\n{document}"),
+        ],
+        ['retrieved_documents', 'job_description', 'blueprint', 'document'],
+    ),
+
+    # CV PATHWAY
+    "CV_Agent": (
+        [
+            (SystemMessage, _SYSTEM_FRAME),
+            (SystemMessage, CVCombinedPrompt),
+            (HumanMessagePromptTemplate, "Retrieved Documents (Background information):\n{retrieved_documents}"),
+            (HumanMessagePromptTemplate, "Input job description summary: {summary}"),
+            (AIMessagePromptTemplate, "Input blueprint from task agent: {blueprint}"),
+        ],
+        ['blueprint', 'retrieved_documents', 'summary'],
+    ),
+
+    "CV_Task_Agent": (
+        [
+            (SystemMessage, _SYSTEM_FRAME),
+            (SystemMessage, CVTaskPrompt),
+            (HumanMessagePromptTemplate, "Retrieved Documents (Background information):\n{retrieved_documents}"),
+            (AIMessagePromptTemplate, "Input from previous agent:\n{task_agent_input}"),
+        ],
+        ['task_agent_input', 'retrieved_documents'],
+    ),
+}
+
+def _compile_message(message_cls: Type, text: str):
+    """
+    Static prompts become plain messages, sent verbatim: no template parsing, so no brace
+    escaping in the prompt sources. Only the short input templates are formatted per call.
+    """
+    if issubclass(message_cls, BaseMessage):
+        return message_cls(content=text)
+    return message_cls.from_template(text)
+
+@lru_cache(maxsize=None)
+def _build_prompt(prompt_type: str) -> Optional[ChatPromptTemplate]:
+    """Parses the templates for a prompt type once; the result is shared between agents."""
+    spec = _PROMPT_SPECS.get(prompt_type)
+    if spec is None:
+        return None
+
+    messages, input_variables = spec
+    return ChatPromptTemplate(
+        messages=[_compile_message(template_cls, template) for template_cls, template in messages],
+        input_variables=input_variables,
+    )
+
+@lru_cache(maxsize=None)
+def static_prefix_tokens(prompt_type: str) -> int:
+    """Tokens in a prompt's leading fixed messages, counted once per process rather than per call."""
+    prompt = _build_prompt(prompt_type)
+    if prompt is None:
+        return 0
+
+    total = 0
+    for message in prompt.messages:
+        if not isinstance(message, BaseMessage):
+            break
+        total += token_count(message.content)
+    return total
 
 class PromptFactory:
     def __init__(self):
         pass
-    
-    def create_prompt(self, prompt_type: str) -> str:
-        prompt = None
-
-        if prompt_type == "Summary_Agent":
-            prompt = ChatPromptTemplate(
-                messages=[
-                    SystemMessagePromptTemplate.from_template(
-                        SystemPrompt + "\n\n" + SummaryPrompt
-                    ),
-                    HumanMessagePromptTemplate.from_template(
-                        "Input job description: {job_description}"
-                    )
-                ],
-                input_variables=[
-                    'job_description'
-                ],
-            )
-
-        elif prompt_type == "Semantic_Alignment_Agent":
-            prompt = ChatPromptTemplate(
-                messages=[
-                    SystemMessagePromptTemplate.from_template(
-                        SystemPrompt + "\n\n" + SemanticAlignmentAgentPrompt
-                    ),
-                    HumanMessagePromptTemplate.from_template(
-                        "Input job description summary: {summary}"
-                    )
-                ],
-                input_variables=[
-                    'summary'
-                ],
-            )
-
-        # COVER LETTER PATHWAY
-        elif prompt_type == "CL_Task_Agent":
-            prompt = ChatPromptTemplate(
-                messages=[
-                    SystemMessagePromptTemplate.from_template(
-                        SystemPrompt + "\n\n" + CoverLetterTaskPrompt
-                    ),
-                    AIMessagePromptTemplate.from_template(
-                        "Input from previous agent:\n{task_agent_input}"
-                    ),
-                    HumanMessagePromptTemplate.from_template(
-                        "Retrieved Documents (Background information):\n{retrieved_documents}"
-                    ),
-                ],
-                input_variables=[
-                    'task_agent_input',
-                    'retrieved_documents'
-                ],
-            )
-
-        elif prompt_type == "CL_Agent":
-            prompt = ChatPromptTemplate(
-                messages=[
-                    SystemMessagePromptTemplate.from_template(
-                        SystemPrompt + "\n\n" + CoverLetterWriterPrompt
-                    ),
-                    AIMessagePromptTemplate.from_template(
-                        "Input blueprint from task agent: {blueprint}"
-                    )
-                ],
-                input_variables=[
-                    'blueprint'
-                ],
-            )
-
-        elif prompt_type == "Quality_Checker_Agent":
-            prompt = ChatPromptTemplate(
-                messages=[
-                    SystemMessagePromptTemplate.from_template(
-                        SystemPrompt + "\n\n" + CoverLetterQualityCheckerPrompt
-                    ),
-
-                    AIMessagePromptTemplate.from_template(
-                        "Writing strategy blueprint:\n{blueprint}"
-                    ),
-
-                    HumanMessagePromptTemplate.from_template(
-                        "Candidate cover letter to be evaluated:\n{document}"
-                    ),
-
-                    HumanMessagePromptTemplate.from_template(
-                        "Retrieved Documents (Background information):\n{retrieved_documents}\n\n"
-                        "Job description for this task:\n{job_description}"
-                    ),
-                ],
-                input_variables=[
-                    'retrieved_documents',
-                    'job_description',
-                    'blueprint',
-                    'document'
-                ],
-            )
-
-        # CV PATHWAY
-        elif prompt_type == "CV_Agent":
-            prompt = ChatPromptTemplate(
-                messages=[
-                    SystemMessagePromptTemplate.from_template(
-                        SystemPrompt
-                    ),
-                    HumanMessagePromptTemplate.from_template(
-                        CVWriterPrompt
-                    )
-                ],
-                input_variables=[
-                    'blueprint',
-                ],
-            )
-
-        elif prompt_type == "CV_Task_Agent":
-            prompt = ChatPromptTemplate(
-                messages=[
-                    SystemMessagePromptTemplate.from_template(
-                        SystemPrompt
-                    ),
-                    HumanMessagePromptTemplate.from_template(
-                        CVTaskPrompt
-                    )
-                ],
-                input_variables=[
-                    'summary',
-                ],
-            )
-
-        return prompt
\ No newline at end of file
+
+    def create_prompt(self, prompt_type: str) -> ChatPromptTemplate:
+        return _build_prompt(prompt_type)
@@ -1,11 +1,14 @@
 # This file will assemble the graph logic from the agents, exposing an interface for the pipeline to use
 
+import uuid
+
 from typing import TypedDict, List, Dict
 
 from langchain_core.messages import  AnyMessage
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 from ..utils.logger import JSONLLogger
+from ..utils.run_cache import RunCache
 from ..factories.agent_factory import SpecialisedAgentFactory
 from .state import RouterGraphState
 from ..graph.node import AgentNodeWrapper
@@ -16,10 +19,13 @@ class RouterGraph:
     - Takes in a dict of agents and adds regular edges between agents with a difference in rank of one
     - If a conditional link is specified the graph will add a conditional edge between the link given 
         and all other nodes in the next ranks
+    - Each node only returns the keys it writes. State keys hold a single value, so two agents
+        writing the same key in one step is an error rather than a silent overwrite
     """
-    def __init__(self, agents, logger: JSONLLogger):
+    def __init__(self, agents, logger: JSONLLogger, run_cache: RunCache | None = None):
         self.agents = agents
         self.logger = logger
+        self.run_cache = run_cache
 
         self.max_rank = max(agent['rank'] for agent in self.agents)
         self.min_rank = min(agent['rank'] for agent in self.agents)
@@ -46,7 +52,17 @@ class RouterGraph:
         memory = MemorySaver()    
 
         self.graph = self.graph.compile(checkpointer=memory)
-        self.config = {"configurable": {"thread_id": "default_thread"}}
+
+        # Routing tables, fixed once the graph is compiled
+        self._route_map = {
+            'Cover Letter': 'CL_Task_Agent',
+            'CV': 'CV_Task_Agent'
+        }
+        # First drafts may skip the task agent; its planning is folded into the writer's prompt
+        self._first_pass_map = {
+            'CV': 'CV_Agent'
+        }
+        self._node_set = frozenset(self.graph.nodes)
 
     def add_edges(self):
         """Add regular edges between adjacent nodes and conditional edges where specified"""
@@ -114,23 +130,22 @@ class RouterGraph:
         router_input = state['latest_message']
 
         task = state.get('task', None)
-        status = router_input.get('status', None) 
-
-        route_map = {
-                'Cover Letter': 'CL_Task_Agent',
-                'CV': 'CV_Task_Agent'
-            }
+        kind = router_input.get('kind', None)
+        status = router_input.get('status', None)
 
-        pathway = route_map[task]
+        if status == 'PASS':
+            return "END"
 
-        if status:
-            pathway = 'END' if status == 'PASS' else route_map[task]
+        if status == 'RETRY':
+            # Only a QC RETRY needs the task agent to re-plan
+            pathway = self._route_map[task]
+        elif status is None and kind == 'SUMMARY':
+            pathway = self._first_pass_map.get(task, self._route_map[task])
+        else:
+            raise ValueError(f"Cannot route {kind or 'unknown'} output with status {status!r}")
 
-        if pathway == 'END':
-            return "END"
-        
         # Handle invalid pathway:
-        if pathway not in self.graph.nodes.keys():
+        if pathway not in self._node_set:
             print(f"[Error: Invalid pathway: {pathway}]")
             return "END"
 
@@ -141,9 +156,83 @@ class RouterGraph:
         self.graph.get_graph().draw_mermaid_png(output_file_path="img/graph.png")
         
     def invoke(self, message):
-        output = self.graph.invoke(message, config=self.config)
-        return output
+        query = self._query_text(message)
 
+        cached_state = self._cached_run(query)
+        if cached_state is not None:
+            return {**message, **cached_state}
 
+        output = self.graph.invoke(message, config=self.thread_config())
+        self.flush()
 
+        if self.run_cache is not None:
+            self.run_cache.put(query, output)
+        return output
+
+    def _cached_run(self, query: str):
+        """Stored final state for this query, if the run cache holds one"""
+        if self.run_cache is None:
+            return None
+
+        cached_state = self.run_cache.get(query)
+        if cached_state is not None:
+            print(f"{'='*60}\n[Run cache hit: replaying stored final state]\n{'='*60}")
+            self.logger.log_event("run_cache_hit", {"cache_key": self.run_cache.key(query)})
+        return cached_state
+
+    @staticmethod
+    def _query_text(message) -> str:
+        """Job description text from a graph input, whether a message or a plain string"""
+        job_description = message.get('job_description')
+        return getattr(job_description, 'content', job_description) or ""
+
+    def batch(self, messages):
+        """
+        Runs several independent inputs through the graph concurrently, one checkpoint thread each.
+        Inputs go through the run cache exactly as in invoke(); only the misses are run.
+        """
+        queries = [self._query_text(message) for message in messages]
+        outputs = [self._cached_run(query) for query in queries]
+        outputs = [
+            {**message, **cached_state} if cached_state is not None else None
+            for message, cached_state in zip(messages, outputs)
+        ]
+
+        misses = [i for i, output in enumerate(outputs) if output is None]
+        if misses:
+            configs = [self.thread_config() for _ in misses]
+            results = self.graph.batch([messages[i] for i in misses], config=configs)
+            self.flush()
+
+            for i, result in zip(misses, results):
+                outputs[i] = result
+                if self.run_cache is not None:
+                    self.run_cache.put(queries[i], result)
+        return outputs
+
+    @staticmethod
+    def thread_config(thread_id: str | None = None):
+        """Checkpoint config for one run; every run gets its own thread, so no state carries over between runs"""
+        return {"configurable": {"thread_id": thread_id or uuid.uuid4().hex}}
+
+    def stream(self, message, thread_id: str, stream_mode=("updates", "messages")):
+        """
+        Runs the graph on its own checkpoint thread, yielding (mode, chunk) pairs as nodes
+        finish ('updates') and as LLM tokens arrive ('messages'). Read the result afterwards
+        with get_final_state(thread_id).
+        """
+        config = self.thread_config(thread_id)
+        for mode, chunk in self.graph.stream(message, config=config, stream_mode=list(stream_mode)):
+            yield mode, chunk
+        self.flush()
+
+    def flush(self):
+        """Waits for the nodes' background draft writes, so a finished run has its files on disk"""
+        for agent in self.agents:
+            flush = getattr(agent['node'], 'flush', None)
+            if flush is not None:
+                flush()
 
+    def get_final_state(self, thread_id: str):
+        """Returns the state values checkpointed by the run on this thread"""
+        return self.graph.get_state(self.thread_config(thread_id)).values
@@ -1,38 +1,90 @@
+import os
+import json
 import time
+import random
+import threading
 import traceback
 
-from typing import Dict, Any, Sequence, List
-import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, List
 from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.outputs import LLMResult
+from langchain_core.exceptions import OutputParserException
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+from pydantic import ValidationError
 
 from ..workflows.processor import StateProcessor
+from ..factories.prompt_factory import PROMPT_CACHE_MIN_TOKENS, static_prefix_tokens
 from ..core.agent import Agent
+
+# Transient provider failures, retried with jittered exponential backoff
+RETRYABLE_API_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+# Malformed structured output, which a fresh sample can fix
+RETRYABLE_OUTPUT_ERRORS = (OutputParserException, ValidationError)
+MAX_BACKOFF_SECONDS = 30
+
+# Draft filenames the writers used when they called write_to_file themselves; others use the tool's default
+DOCUMENT_FILENAMES = {"CV_Agent": "cv_output.txt"}
+
+# Console separators, built once
+_BAR = "=" * 60
+_SUBBAR = "-" * 60
+
+def _extract_tokens(response: LLMResult) -> Dict[str, Any]:
+    """Prompt/completion token counts for a call, including prompt tokens served from the provider's prefix cache."""
+    input_tokens = output_tokens = cached_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if not usage:
+                continue
+            input_tokens += usage.get("input_tokens", 0)
+            output_tokens += usage.get("output_tokens", 0)
+            cached_tokens += (usage.get("input_token_details") or {}).get("cache_read", 0)
+
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cache_read_input_tokens": cached_tokens,
+        "cache_hit_rate": cached_tokens / input_tokens if input_tokens else None,
+    }
+
 class LatencyMonitorCallback(BaseCallbackHandler):
     def __init__(self):
-        self.start_time = 0.0
-        self.first_token_time = 0.0
+        # Monotonic nanosecond timestamps; converted to seconds once in on_llm_end
+        self.start_ns = 0
+        self.first_token_ns = 0
         self.token_count = 0
         self.metrics = {}
 
     def on_llm_start(self, serialized, prompts, **kwargs):
-        self.start_time = time.time()
+        self.start_ns = time.perf_counter_ns()
 
     def on_llm_new_token(self, token: str, **kwargs):
-        if self.token_count == 0:
-            self.first_token_time = time.time()
-            self.metrics["ttft"] = self.first_token_time - self.start_time
+        self.first_token_ns = time.perf_counter_ns()
+        self.metrics["ttft"] = (self.first_token_ns - self.start_ns) / 1e9
+        self.token_count = 1
+        # Later tokens only need counting; swap out the first-token branch
+        self.on_llm_new_token = self._on_subsequent_token
+
+    def _on_subsequent_token(self, token: str, **kwargs):
         self.token_count += 1
 
+    def on_custom_event(self, name: str, data: Any, **kwargs):
+        # Raised by Agent when a response comes from its cache or an identical in-flight call
+        if name == "response_reused":
+            self.metrics["reused_response"] = data["source"]
+            self.metrics["token_usage"] = _extract_tokens(LLMResult(generations=[]))
+
     def on_llm_end(self, response: LLMResult, **kwargs):
-        end_time = time.time()
-        total_time = end_time - self.start_time
+        end_ns = time.perf_counter_ns()
 
-        self.metrics["total_time"] = total_time
+        self.metrics["total_time"] = (end_ns - self.start_ns) / 1e9
         self.metrics["token_count"] = self.token_count
+        self.metrics["token_usage"] = _extract_tokens(response)
 
-        if self.first_token_time > 0:
-            gen_time = end_time - self.first_token_time
+        if self.first_token_ns > 0:
+            gen_time = (end_ns - self.first_token_ns) / 1e9
             self.metrics["generation_time"] = gen_time
             self.metrics["tokens_per_second"] = (
                 self.token_count / gen_time if gen_time > 0 else 0.0
@@ -47,20 +99,44 @@ class AgentNodeWrapper:
             agent: Agent,
             agent_name: str,
             logger,
-            enricher
+            enricher,
+            tool_concurrency_limit: int | None = None
         ):
         self.agent = agent
         self.agent_name = agent_name
         self.logger = logger
         self.enricher = enricher
+        self.tool_concurrency_limit = tool_concurrency_limit or int(os.getenv("TOOL_CONCURRENCY_LIMIT", 8))
+        # Owned by this wrapper so nested agents never wait on a shared pool
+        self.tool_executor = ThreadPoolExecutor(
+            max_workers=self.tool_concurrency_limit,
+            thread_name_prefix=f"{agent_name}_tools"
+        )
+        # Background draft writes not yet finished; flush() waits on them
+        self._pending_writes: set[Future] = set()
+        self._pending_writes_lock = threading.Lock()
         self.processor = StateProcessor(agent_name, enricher)
+        # Size of the byte-identical prefix every call starts with, for judging prefix-cache hit rates
+        self.static_prefix_tokens = static_prefix_tokens(agent_name)
     
     def __call__(self, state: Dict[Any,Any]):
-        print(f'{"="*60}\nAgent called: {self.agent_name}\n{"="*60}')
+        print(f'{_BAR}\nAgent called: {self.agent_name}\n{_BAR}')
         passed_validation = False
         max_retries = 3
         retry_count = 0
 
+        call_start_ns = time.monotonic_ns()
+        precheck_output = self.processor.precheck(state)
+        if precheck_output is not None:
+            print(f'\t* Deterministic check decided {self.agent_name}; skipping the LLM call')
+            self.logger.log_event("agent_precheck", {
+                "agent_name": self.agent_name,
+                "output_message": precheck_output,
+            })
+            output_state = self.processor.prepare_output(precheck_output, state)
+            self._log_qc_round(output_state, call_start_ns, call_tokens=0)
+            return output_state
+
         print(f'\t* Preparing input: {self.agent_name}')
         input_data = self.processor.prepare_input(state) 
         output_state = None
@@ -78,11 +154,15 @@ class AgentNodeWrapper:
                 )
                 elapsed_time = time.time() - start_time
                 
-                latency_metrics = callback.metrics
+                latency_metrics = {
+                    **callback.metrics,
+                    "static_prefix_tokens": self.static_prefix_tokens,
+                    "prefix_cache_eligible": self.static_prefix_tokens >= PROMPT_CACHE_MIN_TOKENS,
+                }
 
                 print(f"\t* Agent invocation took {elapsed_time:.2f} seconds")
 
-                tool_logs = self.process_tool_call(tool_result, self.agent.tools)
+                tool_logs = self.process_tool_call(tool_result, self.agent.tool_map)
             
                 self.logger.log_agent_invocation(
                     agent_name=self.agent_name,
@@ -97,6 +177,13 @@ class AgentNodeWrapper:
 
                 if output_state is not None:
                     passed_validation = True
+                    self._persist_document(output_state)
+
+                    usage = latency_metrics.get("token_usage") or {}
+                    self._log_qc_round(
+                        output_state, call_start_ns,
+                        call_tokens=usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+                    )
 
             except Exception as e:
                 retry_count += 1
@@ -106,43 +193,113 @@ class AgentNodeWrapper:
                     error_message=str(e),
                     traceback=tb_str
                 )
-                print(f"{'='*60}\nError whilst invoking agent {self.agent_name}: {e}\n{'='*60}")
-                print(f"{'='*60}\nAttempting re-run of {self.agent_name}\n{'='*60}")
+                print(f"{_BAR}\nError whilst invoking agent {self.agent_name}: {e}\n{_BAR}")
+
+                if not isinstance(e, RETRYABLE_API_ERRORS + RETRYABLE_OUTPUT_ERRORS):
+                    raise RuntimeError(f"Agent {self.agent_name} failed with a non-retryable error: {e}") from e
 
                 if retry_count >= max_retries:
                     raise RuntimeError(f"Agent {self.agent_name} failed after {max_retries} retries: {e}") from e
+
+                # Back off on provider errors; a malformed output can be re-sampled straight away
+                if isinstance(e, RETRYABLE_API_ERRORS):
+                    delay = min(2 ** retry_count, MAX_BACKOFF_SECONDS) + random.random()
+                    print(f"\t* Backing off for {delay:.1f} seconds")
+                    time.sleep(delay)
+
+                print(f"{_BAR}\nAttempting re-run of {self.agent_name}\n{_BAR}")
         
         return output_state
-    
+
+    def _log_qc_round(self, output_state: Dict[str, Any], call_start_ns: int, call_tokens: int) -> None:
+        """
+        Logs each quality check verdict with this node's wall time (retries included) and the tokens of
+        its accepted call. The writers' costs for the round are in their own invocation logs, so nothing
+        is carried in graph state.
+        """
+        iteration = output_state.get("qc_iterations")
+        if not iteration:
+            return
+
+        latest_message = output_state.get("latest_message") or {}
+        self.logger.log_event("qc_iteration", {
+            "iteration": iteration,
+            "status": latest_message.get("status"),
+            "score": output_state.get("qc_score"),
+            "force_pass_reason": latest_message.get("force_pass_reason"),
+            "wall_time": (time.monotonic_ns() - call_start_ns) / 1e9,
+            "tokens": call_tokens,
+        })
+
+    def _persist_document(self, output_state: Dict[str, Any]) -> None:
+        """Saves a new draft through the write_to_file tool on the tool pool, overlapping the disk write with the next agent."""
+        document = output_state.get("document")
+        write_tool = self.agent.tool_map.get("write_to_file")
+        if not document or write_tool is None:
+            return
+
+        tool_args = {"content": document}
+        if self.agent_name in DOCUMENT_FILENAMES:
+            tool_args["filename"] = DOCUMENT_FILENAMES[self.agent_name]
+
+        future = self.tool_executor.submit(write_tool.invoke, tool_args)
+        with self._pending_writes_lock:
+            self._pending_writes.add(future)
+        future.add_done_callback(self._on_write_done)
+
+    def _on_write_done(self, future: Future) -> None:
+        with self._pending_writes_lock:
+            self._pending_writes.discard(future)
+
+        error = future.exception()
+        if error is not None:
+            print(f"{_BAR}\nFailed to save draft from {self.agent_name}: {error}\n{_BAR}")
+            self.logger.log_agent_error(
+                agent_name=self.agent_name,
+                error_message=f"Failed to save draft: {error}",
+                traceback="".join(traceback.format_exception(error))
+            )
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Blocks until this node's background draft writes have finished."""
+        with self._pending_writes_lock:
+            pending = list(self._pending_writes)
+        wait(pending, timeout=timeout)
+
     def process_tool_call(self,
         result: Any,
-        tools: Sequence[Any],
+        tool_map: Dict[str, Any],
     ):
         if result and hasattr(result, "tool_calls") and result.tool_calls:
             print(f"Processing tool calls from {self.agent_name}")
 
-            tool_logs: List[Dict[str, Any]] = []
-            tool_map = {t.name: t for t in tools}
-
+            # Identical (name, args) calls within a turn only execute once
+            call_keys = []
+            unique_calls = {}
             for call in result.tool_calls:
-                tool_name = call["name"]
-                tool_input = call["args"]
+                print(f'{_SUBBAR}\nTool called: {call["name"]}()\n{_SUBBAR}')
 
-                print(f'{"-"*60}\nTool called: {call["name"]}()\n{"-"*60}')
+                if call["name"] not in tool_map:
+                    raise ValueError(f"Tool '{call['name']}' not found in agent's tool list.")
 
-                matching_tool = tool_map.get(tool_name)
+                key = (call["name"], json.dumps(call["args"], sort_keys=True, default=str))
+                call_keys.append(key)
+                unique_calls.setdefault(key, call)
 
-                if not matching_tool:
-                    raise ValueError(f"Tool '{tool_name}' not found in agent's tool list.")
-                
+            def run_tool(call):
                 try:
-                    tool_output = matching_tool.invoke(tool_input)
+                    return tool_map[call["name"]].invoke(call["args"])
                 except Exception as e:
-                    tool_output = f"[Error executing tool: {e}]"
+                    return f"[Error executing tool: {e}]"
 
-                tool_logs.append(
-                    {"tool_name": tool_name, "args": tool_input, "output": str(tool_output)}
-                )
+            # Tool calls are I/O-bound; dispatch them concurrently and keep call order
+            outputs = dict(zip(unique_calls, self.tool_executor.map(run_tool, unique_calls.values())))
+            tool_outputs = [outputs[key] for key in call_keys]
+
+            tool_logs: List[Dict[str, Any]] = [
+                {"tool_name": call["name"], "args": call["args"], "output": tool_output}
+                for call, tool_output in zip(result.tool_calls, tool_outputs)
+            ]
 
             return tool_logs
         else:
@@ -12,3 +12,7 @@ class RouterGraphState(TypedDict):
     blueprint: str | None
     document: str | None
 
+    # Quality check loop
+    qc_iterations: int | None
+    qc_score: float | None
+    failed_paragraphs: List[int] | None
@@ -0,0 +1,90 @@
+import re
+import numpy as np
+
+from array import array
+from collections import defaultdict
+from itertools import count
+from typing import Dict, Iterable, List
+from scipy.sparse import csr_matrix
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased alphanumeric tokens; punctuation never sticks to a term."""
+    return _TOKEN_RE.findall(text.lower())
+
+class SparseBM25:
+    """
+    BM25 (Okapi) with every term/document weight computed at index time and stored
+    as a sparse |V| x |C| matrix. Scoring a batch of queries is then a single sparse
+    matmul instead of a Python loop per query term. Scores match rank_bm25.BM25Okapi.
+    """
+
+    def __init__(
+        self,
+        tokenized_corpus: Iterable[List[str]],
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.vocab: Dict[str, int] = defaultdict(count().__next__)
+
+        # Flat token-id array across the corpus, built one document at a time so
+        # the tokenized corpus is never held in memory as a list of lists
+        token_ids = array("q")
+        doc_len = array("q")
+        for tokens in tokenized_corpus:
+            doc_len.append(len(tokens))
+            token_ids.extend(self.vocab[token] for token in tokens)
+        self.vocab = dict(self.vocab)
+
+        token_ids = np.frombuffer(token_ids, dtype=np.int64)
+        doc_len = np.frombuffer(doc_len, dtype=np.int64)
+        self.corpus_size = len(doc_len)
+        token_docs = np.repeat(np.arange(self.corpus_size, dtype=np.int64), doc_len)
+
+        # Term frequencies: count each unique (doc, term) pair in one pass
+        vocab_size = len(self.vocab)
+        pairs, term_freqs = np.unique(token_docs * vocab_size + token_ids, return_counts=True)
+        doc_ids, term_ids = np.divmod(pairs, vocab_size)
+        term_freqs = term_freqs.astype(np.float64)
+        doc_len = doc_len.astype(np.float64)
+
+        self.avgdl = doc_len.sum() / self.corpus_size
+
+        # Inverse document frequency; negative values are floored as in BM25Okapi
+        doc_freqs = np.bincount(term_ids, minlength=len(self.vocab))
+        idf = np.log(self.corpus_size - doc_freqs + 0.5) - np.log(doc_freqs + 0.5)
+        idf[idf < 0] = self.epsilon * idf.mean()
+        self.idf = idf
+
+        length_norm = k1 * (1 - b + b * doc_len[doc_ids] / self.avgdl)
+        weights = idf[term_ids] * term_freqs * (k1 + 1) / (term_freqs + length_norm)
+
+        self.matrix = csr_matrix(
+            (weights, (term_ids, doc_ids)),
+            shape=(len(self.vocab), self.corpus_size),
+        )
+
+    def get_scores_batch(self, tokenized_queries: List[List[str]]) -> np.ndarray:
+        """BM25 scores of every document for every query, shape (num_queries, |C|)."""
+        rows, cols = [], []
+        for query_id, tokens in enumerate(tokenized_queries):
+            for token in tokens:
+                term_id = self.vocab.get(token)
+                if term_id is not None:
+                    rows.append(query_id)
+                    cols.append(term_id)
+
+        # Repeated query terms sum, exactly as BM25Okapi iterates over them
+        query_matrix = csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(tokenized_queries), len(self.vocab)),
+        )
+        return (query_matrix @ self.matrix).toarray()
+
+    def get_scores(self, tokenized_query: List[str]) -> np.ndarray:
+        return self.get_scores_batch([tokenized_query])[0]
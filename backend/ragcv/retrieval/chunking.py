@@ -1,33 +1,31 @@
+import os
 import re
+import pysbd
 import tiktoken
-import spacy
-from spacy.language import Language
+from functools import lru_cache
 from typing import List, Optional, Dict, Tuple
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, field, fields
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
-_nlp_cache: Optional[Language] = None
+_splitter_cache: Optional[pysbd.Segmenter] = None
 
-def get_spacy_model() -> Language:
-    """Lazy load spaCy model with sentencizer."""
-    global _nlp_cache
-    if _nlp_cache is None:
-        try: 
-            _nlp_cache = spacy.load(
-                "en_core_web_sm",
-                disable=["tok2vec", "tagger", "parser", "ner", "attribute_ruler", "lemmatizer"]
-            )
-            if "sentencizer" not in _nlp_cache.pipe_names:
-                _nlp_cache.add_pipe("sentencizer")
-        except OSError as e:
-            raise RuntimeError(
-                "SpaCy model 'en_core_web_sm' is not installed. "
-                "Run: python -m spacy download en_core_web_sm"
-            ) from e
-    return _nlp_cache
+_BULLET_RE = re.compile(r'^\s*[-•*]\s+|\s*\d+\.\s+')
+
+# Texts shorter than this skip pysbd and use the regex splitter
+FAST_SPLIT_MAX_CHARS = 2000
+_SENTENCE_BREAK_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+_ABBREVIATIONS = frozenset({"Dr.", "Mr.", "Mrs.", "Ms.", "Prof.", "Inc.", "Ltd.", "Co.", "e.g.", "i.e.", "etc.", "vs."})
+
+def get_sentence_splitter() -> pysbd.Segmenter:
+    """Lazy load the rule-based pysbd sentence segmenter."""
+    global _splitter_cache
+    if _splitter_cache is None:
+        _splitter_cache = pysbd.Segmenter(language="en", clean=False)
+    return _splitter_cache
 
+@lru_cache(maxsize=4)
 def get_encoding(encoding_name: Optional[str] = None):
-    """Get tiktoken encoding for token counting."""
+    """Get tiktoken encoding for token counting (cached per encoding name)."""
     try:
         if encoding_name:
             return tiktoken.get_encoding(encoding_name)
@@ -45,23 +43,54 @@ def token_count(text: str, encoding=None) -> int:
     enc = encoding or get_encoding()
     return len(enc.encode(text))
 
+# Below this many texts a plain loop beats encode_batch, which starts a thread pool on every call
+BATCH_ENCODE_MIN_TEXTS = 256
+
+def token_counts(texts: List[str], encoding=None) -> List[int]:
+    """Count tokens for many texts; only corpus-sized lists are worth a batched, threaded tiktoken call."""
+    if not texts:
+        return []
+    enc = encoding or get_encoding()
+    if len(texts) < BATCH_ENCODE_MIN_TEXTS:
+        return [len(enc.encode_ordinary(text)) for text in texts]
+    return [len(tokens) for tokens in enc.encode_ordinary_batch(texts, num_threads=os.cpu_count() or 1)]
+
+def _fast_split(text: str) -> List[str]:
+    """Regex sentence split that re-joins breaks following common abbreviations."""
+    sentences: List[str] = []
+    for part in _SENTENCE_BREAK_RE.split(text):
+        if sentences and sentences[-1].rsplit(None, 1)[-1] in _ABBREVIATIONS:
+            sentences[-1] = f"{sentences[-1]} {part}"
+        else:
+            sentences.append(part)
+    return sentences
+
 def sentence_tokenize(text: str) -> List[str]:
-    """Split text into sentences using spaCy's sentencizer."""
+    """
+    Split text into sentences. Short texts use a precompiled regex splitter;
+    longer ones go through pysbd's rule-based segmenter.
+    """
     cleaned = text.replace("\r", " ").strip()
     if not cleaned:
         return []
     
-    nlp = get_spacy_model()
-    doc = nlp(cleaned)
+    if len(cleaned) < FAST_SPLIT_MAX_CHARS:
+        segments = _fast_split(cleaned)
+    else:
+        segments = get_sentence_splitter().segment(cleaned)
     
     sentences = []
-    for sent in doc.sents:
-        sent_text = sent.text.strip()
+    for sent in segments:
+        sent_text = sent.strip()
         if sent_text:
             sentences.append(sent_text)
     
     return sentences
 
+def sentence_tokenize_batch(texts: List[str]) -> List[List[str]]:
+    """Split several texts into sentences, reusing one segmenter."""
+    return [sentence_tokenize(text) for text in texts]
+
 def split_bullets(text: str) -> List[str]:
     """
     Split text by bullet points or numbered lists.
@@ -71,14 +100,12 @@ def split_bullets(text: str) -> List[str]:
     bullets = []
     current = []
     
-    bullet_pattern = re.compile(r'^\s*[-•*]\s+|\s*\d+\.\s+')
-    
     for line in lines:
         line_stripped = line.strip()
         if not line_stripped:
             continue
             
-        if bullet_pattern.match(line):
+        if _BULLET_RE.match(line):
             if current:
                 bullets.append(" ".join(current))
             current = [line_stripped]
@@ -116,7 +143,7 @@ def chunk_notes(
 
     return sentence_tokenize(text)
 
-@dataclass
+@dataclass(slots=True)
 class ChunkMetadata:
     chunk_id: str
     chunk_type: str
@@ -129,12 +156,20 @@ class ChunkMetadata:
     bullets: List[str] = field(default_factory=list)
     category: str = ""; skills_list: List[str] = field(default_factory=list)
 
+_CHUNK_FIELDS = tuple(f.name for f in fields(ChunkMetadata))
+
+def chunk_metadata_dict(meta: ChunkMetadata) -> Dict:
+    """Shallow dict of the metadata fields; unlike asdict() it does not deep-copy the lists."""
+    return {name: getattr(meta, name) for name in _CHUNK_FIELDS}
+
 class CVSemanticChunker:
+    # Compiled once per process rather than per chunker instance
+    sect_re = re.compile(r'^(EXPERIENCE|EDUCATION|PROJECTS|SKILLS|SUMMARY|PROFILE)', re.I | re.M)
+    date_re = re.compile(r'(\d{2}/\d{4}|\d{4})\s*[-–—]\s*(\d{2}/\d{4}|\d{4}|Present|Current)', re.I)
+
     def __init__(self, max_tokens: int = 800):
         self.max_tokens = max_tokens
         self.enc = get_encoding()
-        self.sect_re = re.compile(r'^(EXPERIENCE|EDUCATION|PROJECTS|SKILLS|SUMMARY|PROFILE)', re.I | re.M)
-        self.date_re = re.compile(r'(\d{2}/\d{4}|\d{4})\s*[-–—]\s*(\d{2}/\d{4}|\d{4}|Present|Current)', re.I)
 
     def chunk_cv(self, text: str, source: str = None) -> List[Dict]:
         chunks = []
@@ -183,8 +218,7 @@ class CVSemanticChunker:
         res = []
         curr_text, curr_tokens = [], 0
         
-        for item in items:
-            tokens = token_count(item, self.enc)
+        for item, tokens in zip(items, token_counts(items, self.enc)):
             if curr_text and (curr_tokens + tokens > self.max_tokens):
                 res.append(self._finalize(curr_text, sect, c_type, src, f"{start_idx}_{len(res)}", curr_tokens, **extra))
                 curr_text, curr_tokens = [], 0
@@ -198,7 +232,7 @@ class CVSemanticChunker:
         full_text = "\n".join(texts)
         meta = ChunkMetadata(chunk_id=cid, chunk_type=c_type, section=sect, token_count=tks, source_document=src, **extra)
         if c_type == "job": meta.bullets = split_bullets(full_text)
-        return {"text": full_text, "metadata": asdict(meta)}
+        return {"text": full_text, "metadata": chunk_metadata_dict(meta)}
 
 class CoverLetterChunker:
     """
@@ -224,7 +258,7 @@ class CoverLetterChunker:
             [
                 {
                     'text': 'paragraph text...',
-                    'metadata': CoverLetterChunkMetadata(...),
+                    'metadata': {...},  # ChunkMetadata fields
                 },
                 ...
             ]
@@ -237,17 +271,19 @@ class CoverLetterChunker:
         
         chunks = []
         
-        for i, para in enumerate(paragraphs):            
+        para_tokens = token_counts(paragraphs, self.encoding)
+
+        for i, (para, n_tokens) in enumerate(zip(paragraphs, para_tokens)):            
             metadata = ChunkMetadata(
                 chunk_id=f"cl_{i}",
                 chunk_type="cover_letter_paragraph",
                 section="COVER_LETTER",
-                token_count=token_count(para, self.encoding),
+                token_count=n_tokens,
             )
             
             chunks.append({
                 'text': para,
-                'metadata': metadata
+                'metadata': chunk_metadata_dict(metadata)
             })
         
         return chunks
@@ -1,33 +1,100 @@
 from __future__ import annotations
 
-from typing import List, Optional, Any
+import os
+import hashlib
+import threading
+import numpy as np
+
+from collections import OrderedDict
+from typing import List, Optional, Any, Tuple
 
 from langchain_core.documents import Document
 from dataclasses import asdict
 
-from .retrieval import AdaptiveRetriever
+from .retrieval import AdaptiveRetriever, embed_batch
 from ..utils.logger import JSONLLogger
 from ..factories.agent_factory import SpecialisedAgentFactory
 
+RETRIEVAL_CACHE_MAX_ENTRIES = 256
+
+def _semantic_threshold_from_env() -> Optional[float]:
+    """Similarity above which a different summary may reuse a retrieval; unset (the default) disables matching."""
+    value = os.getenv("SEMANTIC_CACHE_THRESHOLD")
+    return float(value) if value else None
+
 class QueryEnricher():
     def __init__(
             self,
             retriever: AdaptiveRetriever, 
-            logger: JSONLLogger
+            logger: JSONLLogger,
+            semantic_threshold: Optional[float] = None
             ):
         self.retriever = retriever
         self.logger = logger
         self.agent_factory = SpecialisedAgentFactory()
 
+        # Retrievals keyed on the exact summary text, oldest first. Near-duplicate matching is opt-in:
+        # postings for the same role at different companies can embed almost identically
+        self.semantic_threshold = semantic_threshold if semantic_threshold is not None else _semantic_threshold_from_env()
+        self._cache: "OrderedDict[str, Tuple[Optional[np.ndarray], list]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
     def get_retrieved_artifacts(self, query: str):
         """ Takes input query, aligns with CV/CoverLetter semantics, and returns retrieved context"""
-        # Convert requirement language into retrieval language
-        self.aligned_queries = self.align_query(query)
+        summary_key = hashlib.blake2b(query.encode("utf-8"), digest_size=16).hexdigest()
+
+        with self._cache_lock:
+            cached = self._cache.get(summary_key)
+            if cached is not None:
+                self._cache.move_to_end(summary_key)
+        if cached is not None:
+            self.logger.log_event("retrieval_cache_hit", {"summary_key": summary_key})
+            return cached[1]
+
+        query_vector = None
+        if self.semantic_threshold is not None:
+            query_vector = embed_batch([query], self.retriever.vectorstore.embeddings)[0]
+            query_vector = query_vector / (np.linalg.norm(query_vector) + 1e-12)
 
-        docs = self.retriever.invoke(self.aligned_queries)
+            match = self._semantic_lookup(query_vector)
+            if match is not None:
+                matched_key, similarity, retrieved_docs = match
+                print(f"[Retrieval reused from a similar summary (cosine {similarity:.3f})]")
+                self.logger.log_event("semantic_cache_hit", {
+                    "summary_key": summary_key,
+                    "matched_summary_key": matched_key,
+                    "similarity": similarity,
+                    "threshold": self.semantic_threshold,
+                })
+                return retrieved_docs
+
+        # Convert requirement language into retrieval language; kept local, as parallel jobs share this enricher
+        aligned_queries = self.align_query(query)
+
+        docs = self.retriever.invoke(aligned_queries)
         retrieved_docs = self.process_docs(docs)
-        self.log_invocation(retrieved_docs)
+        self.log_invocation(aligned_queries, retrieved_docs)
+
+        with self._cache_lock:
+            self._cache[summary_key] = (query_vector, retrieved_docs)
+            if len(self._cache) > RETRIEVAL_CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
         return retrieved_docs
+
+    def _semantic_lookup(self, query_vector: np.ndarray) -> Optional[Tuple[str, float, list]]:
+        """Returns (summary key, similarity, docs) of the most similar earlier summary, if above the threshold."""
+        with self._cache_lock:
+            entries = [(key, vector, docs) for key, (vector, docs) in self._cache.items() if vector is not None]
+            if not entries:
+                return None
+            similarities = np.stack([vector for _, vector, _ in entries]) @ query_vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.semantic_threshold:
+                return None
+
+            key, _, docs = entries[best]
+            self._cache.move_to_end(key)
+            return key, float(similarities[best]), docs
     
     def align_query(self, query) -> List[str]:
         agent = self.agent_factory.create_agent(name="Semantic_Alignment_Agent", temperature=0)
@@ -52,11 +119,11 @@ class QueryEnricher():
         ]
         return retrieved_docs
     
-    def log_invocation(self, retrieved_docs):
+    def log_invocation(self, aligned_queries: List[str], retrieved_docs):
         diagnostics = {}
 
         diagnostics["retriever_config"] = asdict(self.retriever.config)
-        diagnostics["aligned_queries"] = self.aligned_queries
+        diagnostics["aligned_queries"] = aligned_queries
         # Log retrieved docs (if any)
         diagnostics["retrieved_documents"] = retrieved_docs
 
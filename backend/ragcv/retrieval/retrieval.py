@@ -1,16 +1,68 @@
 import numpy as np
 import time
+import torch
+import hashlib
+import heapq
+import threading
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from sentence_transformers import CrossEncoder
 from langchain_core.documents import Document
-from rank_bm25 import BM25Okapi
 
-from .chunking_old import token_count
+from .bm25 import SparseBM25, tokenize
+from .chunking import token_count
 from ..utils.logger import JSONLLogger
 
+# Cross-encoder pairs are scored in batches of similar token length
+RERANK_BATCH_SIZE = 64
+RERANK_BATCH_SIZE_GPU = 128
+SEARCH_MAX_WORKERS = 8
+RRF_K = 60  # Standard RRF constant
+
+# Process-wide LRU of text embeddings (float32 rows), keyed on a content hash
+EMBED_CACHE_MAX_ENTRIES = 4096
+_embedding_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+def embed_batch(texts: List[str], embeddings) -> np.ndarray:
+    """Embeds texts into a (len(texts), D) float32 array; only cache misses are sent to the embeddings API."""
+    model = getattr(embeddings, "model", "")
+    keys = [
+        hashlib.blake2b(f"{model}\0{text}".encode("utf-8"), digest_size=16).digest()
+        for text in texts
+    ]
+
+    vectors: Dict[bytes, np.ndarray] = {}
+    misses: Dict[bytes, str] = {}
+    with _embedding_cache_lock:
+        for key, text in zip(keys, texts):
+            if key in _embedding_cache:
+                _embedding_cache.move_to_end(key)
+                vectors[key] = _embedding_cache[key]
+            else:
+                misses[key] = text
+
+    if misses:
+        miss_vectors = np.asarray(embeddings.embed_documents(list(misses.values())), dtype=np.float32)
+        with _embedding_cache_lock:
+            for key, vector in zip(misses, miss_vectors):
+                vectors[key] = vector
+                _embedding_cache[key] = vector
+            while len(_embedding_cache) > EMBED_CACHE_MAX_ENTRIES:
+                _embedding_cache.popitem(last=False)
+
+    if not keys:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.stack([vectors[key] for key in keys])
+
+def _doc_key(doc: Document) -> str:
+    """Stable identity for a chunk: chunk_ids repeat across source documents, so key on content."""
+    return hashlib.blake2b(doc.page_content.encode("utf-8"), digest_size=8).hexdigest()
+
 @dataclass
 class AdaptiveRetrieverConfig:
     rag_threshold: int = 10000
@@ -18,13 +70,14 @@ class AdaptiveRetrieverConfig:
     rerank_top_k: int = 5     # Final number of documents to return
     rerank_threshold: int = -2
     max_total_chunks: int = 10 
+    max_rerank_candidates: int = 30  # Cap on fused candidates sent to the cross-encoder
     use_hybrid: bool = True
     bm25_weight: float = 0.5  # 0.5 = equal weighting
     embedding_weight: float = 0.5
     reranker_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
 
 class AdaptiveRetriever:
-    """Retrieval helper with hybrid BM25+embeddings, dedupe, and MMR."""
+    """Retrieval helper with hybrid BM25+embeddings, dedupe, and cross-encoder reranking."""
 
     def __init__(
         self,
@@ -37,7 +90,15 @@ class AdaptiveRetriever:
         self.documents = documents
         self.logger = logger
         self.config = config or AdaptiveRetrieverConfig()
-        self.reranker = CrossEncoder(self.config.reranker_model)
+
+        # Rerank in half precision when a GPU is available
+        self.reranker_device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.reranker = CrossEncoder(self.config.reranker_model, device=self.reranker_device)
+        self.rerank_batch_size = RERANK_BATCH_SIZE
+        if self.reranker_device == "cuda":
+            self.reranker.model.half()
+            self.rerank_batch_size = RERANK_BATCH_SIZE_GPU
+        self._token_lengths: Dict[str, int] = {}
         
         # Initialize BM25 index if hybrid retrieval is enabled
         self.bm25 = None
@@ -56,12 +117,9 @@ class AdaptiveRetriever:
                 self.corpus_docs = self.vectorstore.similarity_search("", k=1000)
             
             if self.corpus_docs:
-                # Tokenize corpus for BM25
-                tokenized_corpus = [
-                    doc.page_content.lower().split() 
-                    for doc in self.corpus_docs
-                ]
-                self.bm25 = BM25Okapi(tokenized_corpus)
+                # Tokenize lazily; the index keeps only token ids, corpus_docs keeps references
+                tokenized_corpus = (tokenize(doc.page_content) for doc in self.corpus_docs)
+                self.bm25 = SparseBM25(tokenized_corpus)
         except Exception as e:
             print(f"Warning: BM25 initialization failed: {e}. Falling back to embedding-only retrieval.")
             self.bm25 = None
@@ -115,38 +173,58 @@ class AdaptiveRetriever:
     ) -> List[Tuple[Document, float]]:
         
         all_candidates = {}
+        best_scores = {}
         vectorstore_search_per_query = {}
-        total_search_time = 0
 
-        for query in queries:
+        # Embed every query in one request (cache misses only)
+        embed_start = time.time()
+        query_vectors = embed_batch(queries, self.vectorstore.embeddings)
+        embed_time = time.time() - embed_start
+
+        # Score every query against the BM25 index in one sparse matmul
+        bm25_start = time.time()
+        bm25_scores = None
+        if config.use_hybrid and self.bm25 is not None:
+            bm25_scores = self.bm25.get_scores_batch([tokenize(query) for query in queries])
+        bm25_time = time.time() - bm25_start
+
+        def search(query_idx: int) -> Tuple[List[Tuple[Document, float]], float]:
             search_start = time.time()
-            if config.use_hybrid and self.bm25 is not None:
-                results = self._hybrid_search(query)
+            if bm25_scores is not None:
+                results = self._hybrid_search(query_vectors[query_idx], bm25_scores[query_idx])
             else:
-                results = self.vectorstore.similarity_search_with_relevance_scores(
-                    query, k=self.config.base_k
+                # Rank-based scores, comparable with the hybrid RRF scores
+                vector_results = self.vectorstore.similarity_search_with_score_by_vector(
+                    query_vectors[query_idx], k=self.config.base_k
                 )
-            search_time = time.time() - search_start
+                results = [
+                    (doc, self.config.embedding_weight / (RRF_K + rank))
+                    for rank, (doc, _) in enumerate(vector_results, 1)
+                ]
+            return results, time.time() - search_start
+
+        # Index searches release the GIL, so queries run concurrently; map keeps query order
+        search_start = time.time()
+        with ThreadPoolExecutor(max_workers=max(1, min(SEARCH_MAX_WORKERS, len(queries)))) as executor:
+            search_results = list(executor.map(search, range(len(queries))))
+        total_search_time = time.time() - search_start
+
+        for query, (results, search_time) in zip(queries, search_results):
             vectorstore_search_per_query[query] = search_time
-            total_search_time += search_time
 
-            for doc, _ in results:
-                doc_id = id(doc)
-                if doc_id not in all_candidates:
-                    all_candidates[doc_id] = doc
+            # De-duplicate by content as candidates arrive, keeping each one's best fused score
+            for doc, score in results:
+                doc_key = _doc_key(doc)
+                if doc_key not in all_candidates:
+                    all_candidates[doc_key] = doc
+                best_scores[doc_key] = max(score, best_scores.get(doc_key, score))
 
-        candidates = list(all_candidates.values())
-        if not candidates:
+        if not all_candidates:
             return ([], {"vectorstore_search_per_query": vectorstore_search_per_query})
 
-        # De-duplicate by chunk_id
-        seen_ids = set()
-        unique_docs = []
-        for doc in candidates:
-            chunk_id = doc.metadata.get('chunk_id', id(doc))
-            if chunk_id not in seen_ids:
-                seen_ids.add(chunk_id)
-                unique_docs.append(doc)
+        # Only the strongest fused candidates go to the cross-encoder
+        top_keys = sorted(all_candidates, key=best_scores.__getitem__, reverse=True)
+        unique_docs = [all_candidates[key] for key in top_keys[:config.max_rerank_candidates]]
 
         # Reranking timing
         rerank_start = time.time()
@@ -156,6 +234,8 @@ class AdaptiveRetriever:
         timings = {
             "vectorstore_search_per_query": vectorstore_search_per_query,
             "total_vectorstore_search_time": total_search_time,
+            "embedding_time": embed_time,
+            "bm25_time": bm25_time,
             "rerank_time": rerank_time
         }
 
@@ -164,37 +244,38 @@ class AdaptiveRetriever:
         
         return ranked_docs[:self.config.rerank_top_k]
 
-    def _hybrid_search(self, query: str) -> List[Tuple[Document, float]]:
+    def _hybrid_search(self, query_vector: np.ndarray, bm25_scores: np.ndarray) -> List[Tuple[Document, float]]:
         """
         Combines BM25 and Vector search using Reciprocal Rank Fusion (RRF).
         This ensures we find exact keyword matches for specific requirements.
+        `query_vector` and `bm25_scores` are this query's rows of the batched embeddings and BM25 scores.
         """
         # A. Vector Search
-        vector_results = self.vectorstore.similarity_search_with_relevance_scores(
-            query, k=self.config.base_k
+        vector_results = self.vectorstore.similarity_search_with_score_by_vector(
+            query_vector, k=self.config.base_k
         )
         
         # B. BM25 Search
-        tokenized_query = query.lower().split()
-        bm25_scores = self.bm25.get_scores(tokenized_query)
-        bm25_top_indices = np.argsort(bm25_scores)[::-1][:self.config.base_k]
+        # Partial selection of the top k, then order just those k
+        top_k = min(self.config.base_k, len(bm25_scores))
+        bm25_top_indices = np.argpartition(-bm25_scores, top_k - 1)[:top_k]
+        bm25_top_indices = bm25_top_indices[np.argsort(-bm25_scores[bm25_top_indices])]
         bm25_results = [(self.corpus_docs[i], bm25_scores[i]) for i in bm25_top_indices]
 
-        # C. Reciprocal Rank Fusion (RRF)
+        # C. Reciprocal Rank Fusion (RRF), hashing each document once
         rrf_scores = {}
-        k = 60 # Standard RRF constant
-        
-        for rank, (doc, _) in enumerate(vector_results, 1):
-            rrf_scores[id(doc)] = rrf_scores.get(id(doc), 0) + (self.config.embedding_weight / (k + rank))
-            
-        for rank, (doc, _) in enumerate(bm25_results, 1):
-            rrf_scores[id(doc)] = rrf_scores.get(id(doc), 0) + (self.config.bm25_weight / (k + rank))
+        key_to_doc = {}
+        for weight, results in (
+            (self.config.embedding_weight, vector_results),
+            (self.config.bm25_weight, bm25_results),
+        ):
+            for rank, (doc, _) in enumerate(results, 1):
+                doc_key = _doc_key(doc)
+                key_to_doc.setdefault(doc_key, doc)
+                rrf_scores[doc_key] = rrf_scores.get(doc_key, 0) + weight / (RRF_K + rank)
 
-        # Re-map IDs to Documents
-        id_to_doc = {id(doc): doc for doc, _ in (vector_results + bm25_results)}
-        sorted_ids = sorted(rrf_scores.items(), key=lambda x: x[1], reverse=True)
-        
-        return [(id_to_doc[doc_id], score) for doc_id, score in sorted_ids[:self.config.base_k]]
+        top_keys = heapq.nlargest(self.config.base_k, rrf_scores, key=rrf_scores.__getitem__)
+        return [(key_to_doc[doc_key], rrf_scores[doc_key]) for doc_key in top_keys]
     
     def _rerank_parallel(self, queries: List[str], documents: List[Document]) -> List[Tuple[Document, float]]:
         """
@@ -207,8 +288,16 @@ class AdaptiveRetriever:
         # Create N*M pairs
         pairs = [[q, doc.page_content] for doc in documents for q in queries]
  
-        # Batch predict (Parallelized inference)
-        scores = self.reranker.predict(pairs, batch_size=32)
+        # Sort pairs by token length so each batch pads to a similar length,
+        # then scatter the predictions back to the original pair order
+        doc_lengths = self._doc_token_lengths(documents)
+        query_lengths = [len(ids) for ids in self.reranker.tokenizer(queries, add_special_tokens=False)["input_ids"]]
+        lengths = [d_len + q_len for d_len in doc_lengths for q_len in query_lengths]
+        order = np.argsort(lengths, kind="stable")
+        with torch.inference_mode():
+            sorted_scores = self.reranker.predict([pairs[i] for i in order], batch_size=self.rerank_batch_size)
+        scores = np.empty(len(pairs), dtype=np.float32)
+        scores[order] = sorted_scores
         
         # Reshape and take the Max across the requirement dimension
         # Result: One 'Peak Relevance' score per document
@@ -224,4 +313,13 @@ class AdaptiveRetriever:
                 final_candidates.append(doc)
 
         final_candidates.sort(key=lambda x: x.metadata["rerank_score"], reverse=True)
-        return [(doc, doc.metadata["rerank_score"]) for doc in final_candidates]
\ No newline at end of file
+        return [(doc, doc.metadata["rerank_score"]) for doc in final_candidates]
+
+    def _doc_token_lengths(self, documents: List[Document]) -> List[int]:
+        """Reranker token lengths per document; each distinct chunk is tokenized once per retriever."""
+        keys = [_doc_key(doc) for doc in documents]
+        missing = {key: doc.page_content for key, doc in zip(keys, documents) if key not in self._token_lengths}
+        if missing:
+            encoded = self.reranker.tokenizer(list(missing.values()), add_special_tokens=False)["input_ids"]
+            self._token_lengths.update(zip(missing, map(len, encoded)))
+        return [self._token_lengths[key] for key in keys]
@@ -7,7 +7,6 @@ from ..retrieval.retrieval import AdaptiveRetrieverConfig
 from ..factories.agent_factory import SpecialisedAgentFactory
 from ..graph.node import AgentNodeWrapper
 
-
 def load_graph_config(
     path: str | Path,
     tools: Any,
@@ -18,7 +17,7 @@ def load_graph_config(
     Load graph configuration and construct Agent objects.
     """
     agent_factory = SpecialisedAgentFactory()
-    # Load and validate the config using the class method
+    # Load and validate the config using the class method (cached until the file changes)
     graph_spec = GraphConfig.from_yaml(path)
 
     # Construct Agent objects
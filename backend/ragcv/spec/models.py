@@ -1,8 +1,43 @@
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 from pathlib import Path
 import yaml
 from pydantic import BaseModel, field_validator, model_validator
 
+# libyaml C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+# Closed range shared by temperature and retrieval weight validators
+_UNIT_INTERVAL = (0.0, 1.0)
+
+# (model class, resolved path, mtime_ns) -> validated model
+_validated_configs: Dict[Tuple[type, str, int], BaseModel] = {}
+
+def _config_from_yaml(cls: type, path: Path, label: str) -> BaseModel:
+    """Loads and validates a config file once per (path, mtime); callers get their own copy."""
+    if not path.exists():
+        raise FileNotFoundError(f"{label} config file not found: {path}")
+
+    resolved = path.resolve()
+    key = (cls, str(resolved), path.stat().st_mtime_ns)
+
+    model = _validated_configs.get(key)
+    if model is None:
+        try:
+            with open(resolved, "rb") as f:
+                cfg_dict = yaml.load(f, Loader=_SafeLoader)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Failed to parse YAML from {path}: {e}") from e
+
+        if not cfg_dict:
+            raise ValueError(f"Empty configuration file: {path}")
+
+        model = _validated_configs[key] = cls(**cfg_dict)
+
+    return model.model_copy(deep=True)
+
 class AgentConfig(BaseModel):
     name: str
     rank: int
@@ -13,7 +48,7 @@ class AgentConfig(BaseModel):
 
     @field_validator("temperature")
     def check_temperature_range(cls, v):
-        if v is not None and not (0 <= v <= 1):
+        if v is not None and not (_UNIT_INTERVAL[0] <= v <= _UNIT_INTERVAL[1]):
             raise ValueError("temperature must be between 0 and 1")
         return v
 
@@ -26,7 +61,7 @@ class GraphConfig(BaseModel):
 
     @field_validator("agents")
     def validate_graph(cls, agents):
-        names = {a.name for a in agents}
+        names = frozenset(a.name for a in agents)
 
         # Validate links
         for a in agents:
@@ -41,30 +76,16 @@ class GraphConfig(BaseModel):
                     raise ValueError(f"{a.name}: unknown hard_links: {unknown}")
 
         # Validate ranks: must be contiguous (your code assumes this)
-        ranks = list(set(sorted(a.rank for a in agents)))
-        if ranks != list(range(min(ranks), max(ranks) + 1)):
-            raise ValueError(f"Ranks must be contiguous integers. Got: {ranks}")
+        ranks = {a.rank for a in agents}
+        if len(ranks) != max(ranks) - min(ranks) + 1:
+            raise ValueError(f"Ranks must be contiguous integers. Got: {sorted(ranks)}")
 
         return agents
 
     @classmethod
     def from_yaml(cls, path: str) -> 'GraphConfig':
         """Load and validate GraphConfig from a YAML file."""
-        path = Path(path)
-
-        if not path.exists():
-            raise FileNotFoundError(f"Graph config file not found: {path}")
-
-        try:
-            with open(path, "r") as f:
-                cfg_dict = yaml.safe_load(f)
-        except yaml.YAMLError as e:
-            raise ValueError(f"Failed to parse YAML from {path}: {e}") from e
-
-        if not cfg_dict:
-            raise ValueError(f"Empty configuration file: {path}")
-
-        return cls(**cfg_dict)
+        return _config_from_yaml(cls, Path(path), "Graph")
 
 class RetrievalConfig(BaseModel):
     rag_threshold: int = 10000
@@ -72,6 +93,7 @@ class RetrievalConfig(BaseModel):
     rerank_top_k: int = 5     # Final number of documents to return
     rerank_threshold: int = -2
     max_total_chunks: int = 10 
+    max_rerank_candidates: int = 30  # Cap on fused candidates sent to the cross-encoder
     use_hybrid: bool = True
     bm25_weight: float = 0.5  # 0.5 = equal weighting
     embedding_weight: float = 0.5
@@ -80,7 +102,7 @@ class RetrievalConfig(BaseModel):
     @classmethod
     def validate_weight_range(cls, v: float, info) -> float:
         """Ensure weights are in [0, 1]."""
-        if not 0 <= v <= 1:
+        if not _UNIT_INTERVAL[0] <= v <= _UNIT_INTERVAL[1]:
             raise ValueError(f"{info.field_name} must be between 0 and 1, got {v}")
         return v
 
@@ -99,18 +121,4 @@ class RetrievalConfig(BaseModel):
     @classmethod
     def from_yaml(cls, path: str) -> 'RetrievalConfig':
         """Load and validate RetrievalConfig from a YAML file."""
-        path = Path(path)
-
-        if not path.exists():
-            raise FileNotFoundError(f"Retrieval config file not found: {path}")
-
-        try:
-            with open(path, "r") as f:
-                cfg_dict = yaml.safe_load(f)
-        except yaml.YAMLError as e:
-            raise ValueError(f"Failed to parse YAML from {path}: {e}") from e
-
-        if not cfg_dict:
-            raise ValueError(f"Empty configuration file: {path}")
-
-        return cls(**cfg_dict)
+        return _config_from_yaml(cls, Path(path), "Retrieval")
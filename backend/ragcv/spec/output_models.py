@@ -1,5 +1,32 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional,Literal, Union
+from pydantic import BaseModel, Field, model_validator
+from typing import ClassVar, Dict, List, Optional,Literal, Union
+
+# Models flagged _IS_FLAT hold only scalar fields, so their __dict__ equals model_dump()
+
+class StrategicContextModel(BaseModel):
+    role: str
+    hiring_trigger: str = Field(description="Why they are hiring")
+    company_mission: str = Field(description="Key quote or mission statement")
+    company_stage: Optional[str] = Field(default=None, description="Startup, Enterprise or Agency")
+
+class CoreRequirementsModel(BaseModel):
+    technical_skills: List[str] = Field(description="Ranked by emphasis in the job description")
+    soft_skills: List[str]
+    hard_gates: List[str] = Field(description="Education, years of experience or certifications")
+
+class KeywordsModel(BaseModel):
+    tech_stack: List[str] = Field(description="Exact tool and technology names")
+    ats_keywords: List[str]
+    tone: str = Field(description="Adjectives describing the company voice")
+
+class JobSummaryModel(BaseModel):
+    strategic_context: StrategicContextModel
+    core_requirements: CoreRequirementsModel
+    key_responsibilities: List[str] = Field(description="'responsibility -> expected outcome' entries, top 5")
+    pain_points: List[str] = Field(description="'problem -> implied need' entries")
+    preferred_qualifications: List[str]
+    keywords: KeywordsModel
+    red_flags: List[str] = Field(default_factory=list, description="Unrealistic expectations, if any")
 
 class SummaryAgentOutputModel(BaseModel):
     kind: Literal["SUMMARY"] = "SUMMARY"
@@ -7,12 +34,18 @@ class SummaryAgentOutputModel(BaseModel):
         ...,
         description="Either 'Cover Letter' or 'CV' depending on what the user asks for in the query"
     )
-    summary: str
+    summary: JobSummaryModel = Field(description="The Job Summary, one field per extraction lens")
+
 class SemanticAlignmentAgentOutputModel(BaseModel):
     requirements: List[str] = Field(
         description="List of achievement-framed requirements extracted from job summary"
     )
 
+class QualityScoreModel(BaseModel):
+    specificity: int = Field(ge=1, le=5, description="Specificity test score, 1 (fail) to 5 (excellent)")
+    warmth: int = Field(ge=1, le=5, description="Warmth test score, 1 (fail) to 5 (excellent)")
+    hook: int = Field(ge=1, le=5, description="Hook test score, 1 (fail) to 5 (excellent)")
+
 class QualityCheckerAgentOutputModel(BaseModel):
     kind: Literal["QUALITY_CHECK"] = "QUALITY_CHECK"
 
@@ -30,19 +63,59 @@ class QualityCheckerAgentOutputModel(BaseModel):
         default=None,
         description="If RETRY, one or more concrete example fixes; otherwise 'N/A'"
     )
+
+    score: Optional[QualityScoreModel] = Field(
+        default=None,
+        description="Rubric score per criterion, given for both PASS and RETRY"
+    )
+
+    failed_paragraphs: Optional[List[int]] = Field(
+        default=None,
+        description="If RETRY, the 1-based indices of the paragraphs that need rewriting; omit to request a full rewrite"
+    )
+
+    force_pass_reason: Optional[str] = Field(
+        default=None,
+        description="Set by the orchestrator when it accepts a draft the checker asked to retry; leave empty"
+    )
+
+    robot_failures: Optional[List[str]] = Field(
+        default=None,
+        description="Set by the orchestrator's lexical robot test on cover letters; leave empty"
+    )
     
 class CVTaskAgentOutputModel(BaseModel):
+    _IS_FLAT: ClassVar[bool] = True
     blueprint: str = Field(
         description="The blueprint created from the summarised job description "
     )
 
 class CVAgentOutputModel(BaseModel):
-    document: str = Field(description="Final, human-sounding cover letter text suitable for a high-level candidate")
+    _IS_FLAT: ClassVar[bool] = True
+    document: str = Field(description="The complete tailored CV: Professional Summary, Work Experience and Skills")
+    blueprint: Optional[str] = Field(
+        default=None,
+        description="The plan the CV was written from, only when no blueprint was given as input"
+    )
 
 class CLTaskAgentOutputModel(BaseModel):
+    _IS_FLAT: ClassVar[bool] = True
     blueprint: str = Field(
         description="The blueprint created from the summarised job description "
     )
 
 class CLAgentOutputModel(BaseModel):
-    document: str = Field(description="Final, human-sounding cover letter text suitable for a high-level candidate")
+    document: Optional[str] = Field(
+        default=None,
+        description="Final, human-sounding cover letter text suitable for a high-level candidate"
+    )
+    revised_paragraphs: Optional[Dict[int, str]] = Field(
+        default=None,
+        description="In a selective revision, the rewritten paragraphs keyed by their 1-based index, instead of the full document"
+    )
+
+    @model_validator(mode="after")
+    def _has_content(self):
+        if not self.document and not self.revised_paragraphs:
+            raise ValueError("Either 'document' or 'revised_paragraphs' must be given")
+        return self
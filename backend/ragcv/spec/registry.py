@@ -1,6 +1,9 @@
+from types import MappingProxyType
+
 from .output_models import *
 
-PYDANTIC_REGISTRY = {
+# Read-only view: agent output schemas are fixed at import time
+PYDANTIC_REGISTRY = MappingProxyType({
     "Summary_Agent": SummaryAgentOutputModel,
     "Semantic_Alignment_Agent": SemanticAlignmentAgentOutputModel,
     "CV_Task_Agent": CVTaskAgentOutputModel,
@@ -8,4 +11,4 @@ PYDANTIC_REGISTRY = {
     "CL_Task_Agent": CLTaskAgentOutputModel,
     "CL_Agent": CLAgentOutputModel,
     "Quality_Checker_Agent": QualityCheckerAgentOutputModel,
-}
\ No newline at end of file
+})
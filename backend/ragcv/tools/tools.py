@@ -1,4 +1,4 @@
-import os
+from pathlib import Path
 from typing import Callable, List, Any
 from langchain.tools import tool
 
@@ -12,11 +12,12 @@ def build_registry(test_name: str) -> List[Any]:
     ]
 
 def make_write_to_file(test_name: str) -> Callable[[str, str], str]:
+    out_dir = Path("output") / test_name
+    out_dir.mkdir(parents=True, exist_ok=True)
+
     def inner(content: str, filename: str = "output.txt") -> str:
-        os.makedirs(os.path.join("output", test_name), exist_ok=True)
-        filepath = os.path.join("output", test_name, filename)
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(content)
+        filepath = out_dir / filename
+        filepath.write_text(content, encoding="utf-8")
         return f"[FileTool] Output successfully written to {filepath}"
     return inner
 
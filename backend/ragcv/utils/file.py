@@ -1,7 +1,8 @@
-import os 
+from pathlib import Path
+
+OUTPUT_DIR = Path("output")
 
 def write_to_file(content: str, filename: str = "output.txt") -> str:
-    filepath = os.path.join("output", filename)
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(content)
+    filepath = OUTPUT_DIR / filename
+    filepath.write_text(content, encoding="utf-8")
     return f"[FileTool] Output successfully written to {filepath}"
@@ -1,40 +1,103 @@
-import json
-import os
+import time
+import queue
+import atexit
+import orjson
 import threading
 from datetime import datetime, timezone
+from pathlib import Path
 
 from langchain_core.messages import BaseMessage, AnyMessage
-from typing import Any, Dict, List, Annotated
+from typing import Any, Dict, List, Tuple, Annotated
 
 class JSONLLogger:
     """Simple JSONL logger for agent diagnostics."""
 
+    # Records accumulate in memory and are handed to the writer in blocks of this size
+    BUFFER_LIMIT = 64 * 1024
+
     def __init__(self, log_path: str = "logs/agent_runs.jsonl"):
         self.log_path = log_path
         self._lock = threading.Lock()
-        self.conversation_log: List[Dict] = []
+        # (agent name, output or error message); display dicts are built on demand
+        self.conversation_log: List[Tuple[str, Any]] = []
+
+        Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+
+        # JSONL (one compact object per line) for app logs, indented otherwise
+        self._dump_option = orjson.OPT_NON_STR_KEYS
+        if 'app' not in self.log_path:
+            self._dump_option |= orjson.OPT_INDENT_2
 
-        log_dir = os.path.dirname(log_path)
-        if log_dir and not os.path.exists(log_dir):
-            os.makedirs(log_dir, exist_ok=True)
-        if os.path.exists(self.log_path):
-            with open(self.log_path, "w", encoding="utf-8") as log_file:
-                pass  
+        # Records are serialized and buffered on the caller's thread; full buffers
+        # are written by a background writer that owns the file handle. Opening
+        # with "wb" creates or truncates, so each logger starts from an empty file
+        self._log_file = open(self.log_path, "wb")
+        self._buf = bytearray()
+        self._closed = False
+
+        # Wall-clock time is stamped once in a header record; entries carry monotonic offsets from it
+        self._t0_mono = time.monotonic_ns()
+        self._buf += orjson.dumps(
+            {"event": "log_start", "timestamp": datetime.now(timezone.utc), "elapsed_ns": 0},
+            option=self._dump_option,
+        )
+        self._buf.append(0x0A)
+        self._queue: "queue.Queue[bytearray | None]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="jsonl-logger", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
 
     def log(self, payload: Dict[str, Any]) -> None:
-        """Write a payload as a JSON line with timestamp metadata."""
+        """Write a payload as a JSON line with its nanosecond offset from the log_start header."""
         entry = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "elapsed_ns": time.monotonic_ns() - self._t0_mono,
             **payload,
         }
-        # JSONL for easier parsing
-        if 'app' in self.log_path:
-            serialized = json.dumps(entry, default=self._fallback_serializer)
-        else: 
-            serialized = json.dumps(entry, indent=4, default=self._fallback_serializer)
+        serialized = orjson.dumps(entry, default=self._fallback_serializer, option=self._dump_option)
+        with self._lock:
+            if self._closed:
+                return
+            self._buf += serialized
+            self._buf.append(0x0A)
+            if len(self._buf) >= self.BUFFER_LIMIT:
+                self._handoff()
+
+    def flush(self) -> None:
+        """Wait for buffered records to be written, then push them to disk."""
+        with self._lock:
+            if self._closed:
+                return
+            self._handoff()
+        self._queue.join()
+
+    def close(self) -> None:
+        """Drain the buffer, then flush and close the log file; safe to call more than once."""
         with self._lock:
-            with open(self.log_path, "a", encoding="utf-8") as log_file:
-                log_file.write(serialized + "\n")
+            if self._closed:
+                return
+            self._closed = True
+            self._handoff()
+            self._queue.put(None)
+        self._writer.join()
+        self._log_file.close()
+        atexit.unregister(self.close)
+
+    def _handoff(self) -> None:
+        """Queue the current buffer for the writer; the caller holds the lock."""
+        if self._buf:
+            self._queue.put_nowait(self._buf)
+            self._buf = bytearray()
+
+    def _write_loop(self) -> None:
+        while True:
+            block = self._queue.get()
+            try:
+                if block is None:
+                    return
+                self._log_file.write(block)
+                self._log_file.flush()
+            finally:
+                self._queue.task_done()
 
     @staticmethod
     def _fallback_serializer(obj: Any) -> Any:
@@ -66,7 +129,7 @@ class JSONLLogger:
         }
     
         self.log(payload=payload)
-        self.conversation_log.append(payload)
+        self.conversation_log.append((agent_name, output_message))
     
     def log_event(
         self,
@@ -87,33 +150,17 @@ class JSONLLogger:
             "traceback": traceback
         }
         self.log(payload=payload)
-        self.conversation_log.append(payload)
+        self.conversation_log.append((agent_name, error_message))
 
     def log_conversation(self) -> None:
-        conversation = []
-        for message in self.conversation_log:
-            name = message['agent_name']
-            content = message.get('output_message', None)
-            if content is None: 
-                content = message.get('error_message')
-            conversation.append({
-                'agent_name': name,
-                'content': content
-            })
-
         self.log(payload={
-                "full_conversation": conversation
+                "full_conversation": self.get_conversation_log()
             }
         )
+        self.flush()
 
-    def get_conversation_log(self) -> None:
-        conversation = []
-        for message in self.conversation_log:
-            name = message['agent_name']
-            content = message['output_message']
-            conversation.append({
-                'agent_name': name,
-                'content': content
-            })
-
-        return conversation
\ No newline at end of file
+    def get_conversation_log(self) -> List[Dict[str, Any]]:
+        return [
+            {'agent_name': name, 'content': content}
+            for name, content in self.conversation_log
+        ]
@@ -0,0 +1,103 @@
+import os
+import hashlib
+import threading
+import orjson
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+# Opt-in: a hit replays a stored final state, including drafts sampled at non-zero temperature
+RUN_CACHE_ENV = "RAGCV_RUN_CACHE"
+
+def run_cache_enabled() -> bool:
+    return os.getenv(RUN_CACHE_ENV, "").lower() in ("1", "true", "yes", "on")
+
+@lru_cache(maxsize=1)
+def source_fingerprint() -> str:
+    """Hash of the package source, so a code change invalidates every stored run."""
+    digest = hashlib.blake2b(digest_size=16)
+    package_dir = Path(__file__).resolve().parents[1]
+    for path in sorted(package_dir.rglob("*.py")):
+        digest.update(str(path.relative_to(package_dir)).encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+def graph_fingerprint(agents: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Everything in the loaded graph spec that shapes an agent's output: links, model, temperature and prompt."""
+    spec = []
+    for entry in agents:
+        agent = entry["node"].agent
+        spec.append({
+            "name": entry["name"],
+            "rank": entry["rank"],
+            "conditional_links": entry.get("conditional_links"),
+            "hard_links": entry.get("hard_links"),
+            "model_name": agent.model_name,
+            "temperature": agent.temperature,
+            "prompt": agent.prompt.pretty_repr(),
+        })
+    return {"agents": spec, "source": source_fingerprint()}
+
+class RunCache:
+    """
+    JSONL cache of final graph states, keyed on the normalised query and an environment
+    fingerprint (corpus metadata, retrieval config, graph spec, prompts, models and source).
+    A hit replays the stored state so repeat runs make no LLM calls; any change to the
+    fingerprint misses. Disabled unless `enabled` or RAGCV_RUN_CACHE is set.
+    """
+
+    # State keys that are replayed on a hit; the job description comes from the new input
+    CACHED_KEYS = ("latest_message", "retrieved_documents", "task", "summary", "blueprint", "document")
+
+    def __init__(
+        self,
+        cache_path: str = "logs/run_cache.jsonl",
+        fingerprint: Optional[Dict[str, Any]] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self.cache_path = cache_path
+        self.enabled = run_cache_enabled() if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._fingerprint_blob = orjson.dumps(
+            fingerprint or {}, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str
+        )
+
+        if not self.enabled:
+            return
+
+        cache_dir = os.path.dirname(cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        if os.path.exists(cache_path):
+            with open(cache_path, "rb") as cache_file:
+                for line in cache_file:
+                    if line.strip():
+                        record = orjson.loads(line)
+                        self._entries[record["key"]] = record["state"]
+
+    def key(self, query: str) -> str:
+        normalised = " ".join(query.split())
+        digest = hashlib.sha256(normalised.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(self._fingerprint_blob)
+        return digest.hexdigest()
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            return self._entries.get(self.key(query))
+
+    def put(self, query: str, state: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        cached_state = {k: state[k] for k in self.CACHED_KEYS if k in state}
+        record = {"key": self.key(query), "state": cached_state}
+        serialized = orjson.dumps(record, option=orjson.OPT_NON_STR_KEYS, default=str)
+
+        with self._lock:
+            self._entries[record["key"]] = orjson.loads(serialized)["state"]
+            with open(self.cache_path, "ab") as cache_file:
+                cache_file.write(serialized + b"\n")
@@ -1,20 +1,26 @@
+import re
 import argparse
+from dataclasses import asdict
 from datetime import datetime as dt
+from pathlib import Path
 
 from langchain_core.messages import HumanMessage
 from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
 
 from dotenv import load_dotenv
 
-from ..core.loader import DataLoader
+from ..core.loader import DataLoader, get_embeddings
 from ..graph.graph import RouterGraph
 from ..utils.logger import JSONLLogger
+from ..utils.run_cache import RunCache, graph_fingerprint, run_cache_enabled
 from ..retrieval.enricher import QueryEnricher
 from ..retrieval.retrieval import AdaptiveRetriever
 from ..tools.tools import build_registry
 from ..utils.file import write_to_file
 from ..spec.loader import load_graph_config, load_retrieval_config
+from .processor import summary_to_markdown
+
+QUERY_SEPARATOR = re.compile(r"^---\s*$", re.M)
 
 def main():
     load_dotenv()
@@ -23,12 +29,14 @@ def main():
     # Read in test name 
     time = dt.now().strftime("%Y-%m-%d_%H-%M-%S")
     parser.add_argument("--test_name", default=time)
+    # Off by default: a hit replays the stored result instead of sampling a new draft
+    parser.add_argument("--run_cache", action="store_true", default=run_cache_enabled())
     args = parser.parse_args()
 
     log_path = f"logs/ragcv_headless_log_{args.test_name}.jsonl"
 
     loader = DataLoader(data_path="data_real/", db_path="data/db.faiss")
-    embeddings = OpenAIEmbeddings()
+    embeddings = get_embeddings()
     logger = JSONLLogger(log_path=log_path)
 
     # Construct vectorstore (either done from local save or re-generated if new data is present)
@@ -58,20 +66,41 @@ def main():
         enricher=enricher
     )
 
+    # Repeat runs with an unchanged corpus, config, prompts, models and code replay the stored final state
+    run_cache = RunCache(
+        fingerprint={
+            **loader.generate_db_metadata(),
+            "vector_count": vectorstore.index.ntotal,
+            "retrieval": asdict(retrieval_cfg),
+            "graph": graph_fingerprint(graph_cfg),
+        },
+        enabled=args.run_cache,
+    )
+
     # Construct graph
-    graph = RouterGraph(agents=graph_cfg, logger=logger)
+    graph = RouterGraph(agents=graph_cfg, logger=logger, run_cache=run_cache)
 
-    with open("input/query.txt", "r") as f:
-        query = f.read()
+    # Several job descriptions can be given in one file, separated by a line containing only '---'
+    query_text = Path("input/query.txt").read_text(encoding="utf-8")
+    queries = [q.strip() for q in QUERY_SEPARATOR.split(query_text) if q.strip()]
     
     graph.draw() # Optional
     
-    final_state = graph.invoke({
-        'job_description' : HumanMessage(content=query),
-    })
+    if len(queries) == 1:
+        final_state = graph.invoke({
+            'job_description' : HumanMessage(content=queries[0]),
+        })
+
+        write_to_file(final_state.get("document", "Error: No Document Found"), "output.txt")
+        write_to_file(summary_to_markdown(final_state.get("summary")) or "Error: No Summary Found", "summary.txt")
+    else:
+        final_states = graph.batch([
+            {'job_description' : HumanMessage(content=query)} for query in queries
+        ])
 
-    write_to_file(final_state.get("document", "Error: No Document Found"), "output.txt")
-    write_to_file(final_state.get("summary", "Error: No Summary Found"), "summary.txt")
+        for i, final_state in enumerate(final_states):
+            write_to_file(final_state.get("document", "Error: No Document Found"), f"output_{i}.txt")
+            write_to_file(summary_to_markdown(final_state.get("summary")) or "Error: No Summary Found", f"summary_{i}.txt")
     
     # Print console summary
     print("\n" + "="*60)
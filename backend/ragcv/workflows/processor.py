@@ -1,6 +1,50 @@
-from typing import Dict, Any, Optional
+import os
+import orjson
+
+from typing import Dict, Any, List, Optional
 
 from ..graph.state import RouterGraphState
+from .prompts._cache import render_documents
+from .qc.lexical import PARAGRAPH_BREAK, must_include_terms, robot_fail, specificity_fail
+from ..spec.output_models import QualityCheckerAgentOutputModel
+
+# Revision rounds the quality checker may request before its verdict is accepted as final
+QC_MAX_ITERS = int(os.getenv("COVERLETTER_MAX_ITERS", 2))
+# A RETRY whose mean rubric score improved by less than this over the last round stops the loop
+QC_MIN_SCORE_DELTA = 0.1
+
+# Stands in for the blueprint on a first CV draft, which the writer plans itself
+NO_BLUEPRINT_CLAUSE = (
+    "No blueprint yet. Plan the CV yourself as described under PLANNING and return the plan in 'blueprint'."
+)
+
+def summary_to_markdown(summary: Optional[str]) -> Optional[str]:
+    """Readable Markdown view of a compact JSON job summary, for people rather than agents."""
+    try:
+        sections = orjson.loads(summary)
+    except (orjson.JSONDecodeError, TypeError):
+        return summary
+    if not isinstance(sections, dict):
+        return summary
+
+    def label(key: str) -> str:
+        return key.replace("_", " ").title()
+
+    def items(value) -> str:
+        return ", ".join(map(str, value)) if isinstance(value, list) else str(value)
+
+    lines = ["# Job Summary"]
+    for section, content in sections.items():
+        if not content:
+            continue
+        lines.append(f"\n## {label(section)}")
+        if isinstance(content, dict):
+            lines.extend(f"+ **{label(key)}:** {items(value)}" for key, value in content.items() if value)
+        elif isinstance(content, list):
+            lines.extend(f"+ {item}" for item in content)
+        else:
+            lines.append(f"+ {content}")
+    return "\n".join(lines)
 
 class StateProcessor:
     def __init__(self, name: str, enricher) -> None:
@@ -20,7 +64,7 @@ class StateProcessor:
                     "status": status,
                     "summary": state.get("summary"),
                 },
-                "retrieved_documents": state.get("retrieved_documents"),
+                "retrieved_documents": render_documents(state.get("retrieved_documents")),
             }
 
             # Retry-specific augmentation
@@ -30,24 +74,167 @@ class StateProcessor:
                     "specific_fix_instructions": latest_message.get("specific_fix_instructions"),
                 })
             return output
-        
-        
 
-        return state
+        output = {**state}
+
+        # Writers and the quality checker see the same rendered block as the task agent
+        if state.get("retrieved_documents") is not None:
+            output["retrieved_documents"] = render_documents(state["retrieved_documents"])
+
+        if self.name == "CL_Agent":
+            output["revision_request"] = self._revision_request(state)
+
+        # A first CV draft arrives straight from the Summary agent and is planned by the writer itself
+        if self.name == "CV_Agent":
+            output["blueprint"] = state.get("blueprint") or NO_BLUEPRINT_CLAUSE
+
+        return output
+
+    def precheck(self, state: RouterGraphState) -> Optional[QualityCheckerAgentOutputModel]:
+        """
+        Deterministic verdict that makes the LLM call unnecessary: a cover letter missing terms the
+        blueprint lists under MUST_INCLUDE_DETAILS is sent back without invoking the quality checker.
+        It counts as a QC round, except on the last one, which is left to the LLM checker.
+        """
+        if self.name != "Quality_Checker_Agent" or state.get('task') != "Cover Letter":
+            return None
+
+        # The capped round is always judged by the LLM checker: the gate only accepts a scored verdict,
+        # and a heuristic miss must not be what ends the loop
+        if (state.get('qc_iterations') or 0) >= QC_MAX_ITERS:
+            return None
+
+        required = must_include_terms(state.get("blueprint") or "")
+        missing = specificity_fail(required, state.get("document") or "") if required else []
+        if not missing:
+            return None
+
+        return QualityCheckerAgentOutputModel(
+            status="RETRY",
+            critique="The letter drops details the blueprint marks as MUST_INCLUDE_DETAILS.",
+            specific_fix_instructions=f"Restore terms: {sorted(missing)}",
+        )
+
+    @staticmethod
+    def _revision_request(state: RouterGraphState) -> str:
+        """Asks for only the paragraphs the quality checker flagged when there is a draft to splice them into."""
+        failed_paragraphs = state.get("failed_paragraphs")
+        previous_draft = state.get("document")
+
+        if not failed_paragraphs or not previous_draft:
+            return "None. Write the full letter in 'document'."
+
+        return (
+            f"Rewrite only paragraphs {sorted(set(failed_paragraphs))} of the previous draft below and return them in "
+            "'revised_paragraphs', keyed by paragraph number; every other paragraph is kept as it is.\n\n"
+            f"Previous draft:\n{previous_draft}"
+        )
     
     def prepare_output(self, agent_output, state: Dict[str, Any]) -> Dict[str, Any]:
-        output_state = state.copy()
-        agent_data = agent_output.model_dump()
+        # Flat outputs skip model_dump's recursive conversion; copy so a cached response's state is never shared
+        if getattr(type(agent_output), "_IS_FLAT", False):
+            agent_data = agent_output.__dict__.copy()
+        else:
+            agent_data = agent_output.model_dump()
+
+        # Structured summaries travel through state, prompts and caches as compact JSON text
+        if isinstance(agent_data.get('summary'), dict):
+            agent_data['summary'] = orjson.dumps(agent_data['summary']).decode()
+
+        # The lexical checks and the gate may change the verdict, so they run before agent_data is copied into the update
+        qc_state = {}
+        if agent_data.get('kind') == "QUALITY_CHECK":
+            self._merge_lexical_checks(agent_data, state)
+            qc_state = self._quality_gate(agent_data, state)
 
-        # Copy agent keys to top-level
-        for k, v in agent_data.items():
-            output_state[k] = v  # now top-level 'task' will be updated
+        # Only return the keys this agent writes, so agents running in the same
+        # step never overwrite each other's updates with a stale copy of the state
+        output_state = {**agent_data, "latest_message": agent_data, **qc_state}  # now top-level 'task' will be updated
 
-        output_state["latest_message"] = agent_data
+        # A selective revision only carries the rewritten paragraphs; splice them into the last draft
+        if agent_data.get('revised_paragraphs') and not agent_data.get('document'):
+            output_state['document'] = self._splice_paragraphs(
+                state.get('document'), agent_data['revised_paragraphs']
+            )
+
+        # Writers only return a blueprint when they planned the draft themselves
+        if 'blueprint' in agent_data and agent_data['blueprint'] is None:
+            del output_state['blueprint']
 
         if 'summary' in agent_data and self.enricher:
             print(f'{"="*60}\nRetrieving documents from Summary\n{"="*60}')
 
             output_state['retrieved_documents'] = self.enricher.get_retrieved_artifacts(agent_data['summary'])
 
+            # A new job starts with no plan or draft and a fresh quality check loop
+            output_state['blueprint'] = None
+            output_state['document'] = None
+            output_state['qc_iterations'] = 0
+            output_state['qc_score'] = None
+            output_state['failed_paragraphs'] = None
+
         return output_state
+
+    @staticmethod
+    def _merge_lexical_checks(agent_data: Dict[str, Any], state: Dict[str, Any]) -> None:
+        """
+        Applies the deterministic robot test to a cover letter and folds any failure into the LLM verdict.
+        CV bullets routinely open with 'I'/'My', so CVs are exempt. The result is reported in
+        'robot_failures', apart from the LLM rubric that the quality gate averages.
+        """
+        if state.get('task') != "Cover Letter":
+            return
+
+        reasons = robot_fail(state.get('document') or "")
+        agent_data['robot_failures'] = reasons or None
+        if not reasons:
+            return
+
+        fixes = " ".join(reasons)
+        if agent_data['status'] == "PASS":
+            # The LLM found nothing else to fix, so the robot failures are the whole critique
+            agent_data.update(status="RETRY", critique="Robot test failed.", specific_fix_instructions=fixes, failed_paragraphs=None)
+        else:
+            agent_data['critique'] = f"{agent_data.get('critique') or ''} Robot test failed.".strip()
+            agent_data['specific_fix_instructions'] = f"{agent_data.get('specific_fix_instructions') or ''} {fixes}".strip()
+
+    def _quality_gate(self, agent_data: Dict[str, Any], state: Dict[str, Any]) -> Dict[str, Any]:
+        """Caps the RETRY loop: after QC_MAX_ITERS revisions, or once revisions stop improving the score, the draft is accepted."""
+        iteration = (state.get('qc_iterations') or 0) + 1
+        previous_score = state.get('qc_score')
+
+        rubric = agent_data.get('score')
+        score = sum(rubric.values()) / len(rubric) if rubric else None
+
+        if agent_data['status'] == "RETRY":
+            # An unscored verdict (e.g. a precheck) is never forced through
+            if score is None:
+                stop_reason = None
+            elif iteration > QC_MAX_ITERS:
+                stop_reason = f"reached {QC_MAX_ITERS} revisions"
+            elif previous_score is not None and score - previous_score < QC_MIN_SCORE_DELTA:
+                stop_reason = f"score moved {previous_score:.2f} -> {score:.2f}"
+            else:
+                stop_reason = None
+
+            if stop_reason is not None:
+                print(f'{"="*60}\nQuality check loop stopped early: {stop_reason}\n{"="*60}')
+                agent_data['status'] = "PASS"
+                agent_data['force_pass_reason'] = stop_reason
+
+        # A precheck verdict carries no rubric; the last scored round stays the plateau baseline
+        return {'qc_iterations': iteration, 'qc_score': score if score is not None else previous_score}
+
+    @staticmethod
+    def _splice_paragraphs(previous_draft: Optional[str], revised: Dict[int, str]) -> str:
+        """Replaces the numbered (1-based) paragraphs of the previous draft; without one, the revisions are the letter."""
+        if not previous_draft:
+            return "\n\n".join(revised[index].strip() for index in sorted(revised))
+
+        paragraphs: List[str] = PARAGRAPH_BREAK.split(previous_draft.strip())
+        for index, text in revised.items():
+            if 1 <= index <= len(paragraphs):
+                paragraphs[index - 1] = text.strip()
+            else:
+                print(f"[Dropped revision of paragraph {index}: the previous draft has {len(paragraphs)}]")
+        return "\n\n".join(paragraphs)
@@ -0,0 +1,49 @@
+import hashlib
+import threading
+import orjson
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# Rendered document blocks, keyed by a hash of the serialized document list
+RENDER_CACHE_MAX_ENTRIES = 256
+
+_rendered_docs: "OrderedDict[str, str]" = OrderedDict()
+_rendered_docs_lock = threading.Lock()
+
+def docs_hash(docs: List[Dict[str, Any]]) -> str:
+    """Content hash of a retrieved document list; identical sets hash alike across agents and retries."""
+    blob = orjson.dumps(docs, option=orjson.OPT_NON_STR_KEYS, default=str)
+    return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+def render_documents(docs: Optional[List[Dict[str, Any]]]) -> str:
+    """
+    Renders retrieved documents as the `Context (most relevant first)` block the prompts
+    describe. The same set is rendered once per job, then served from the cache to every
+    agent and every QC retry that receives it.
+    """
+    if not docs:
+        return "Context (most relevant first): none retrieved"
+
+    key = docs_hash(docs)
+    with _rendered_docs_lock:
+        if key in _rendered_docs:
+            _rendered_docs.move_to_end(key)
+            return _rendered_docs[key]
+
+    blocks = ["Context (most relevant first)"]
+    for rank, doc in enumerate(docs, start=1):
+        score = doc.get("rerank_score")
+        header = f"[{rank}] [score={score:.2f}]" if isinstance(score, (int, float)) else f"[{rank}]"
+        details = " | ".join(
+            f"{name}={value}" for name, value in doc.items()
+            if name not in ("text", "rerank_score") and value not in (None, "", [], {})
+        )
+        blocks.append(f"{header} {details}\n{doc.get('text', '')}")
+    rendered = "\n\n".join(blocks)
+
+    with _rendered_docs_lock:
+        _rendered_docs[key] = rendered
+        if len(_rendered_docs) > RENDER_CACHE_MAX_ENTRIES:
+            _rendered_docs.popitem(last=False)
+    return rendered
@@ -0,0 +1,14 @@
+# Scaffolding shared by the agent prompts, so every prompt module uses the same heading style.
+
+_BANNER = "=" * 69
+
+def role_header(name: str) -> str:
+    return f"SYSTEM PROMPT — {name}\n"
+
+def section(title: str) -> str:
+    return f"\n{_BANNER}\n{title}\n{_BANNER}\n\n"
+
+_REVISION_MODE_CLAUSE = (
+    "If the input has status RETRY, it carries a `critique` and `specific_fix_instructions` "
+    "from the Quality_Checker_Agent. Addressing `specific_fix_instructions` is your highest-priority rule.\n"
+)
@@ -0,0 +1,92 @@
+import re
+
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List
+
+# Deterministic quality checks, run in Python so the LLM quality checker only judges tone
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_FIRST_PERSON_START = re.compile(r"^\s*(I|My)\b")
+_MECHANISM_PHRASE = re.compile(r"\bThis (resulted in|demonstrated|led to|enabled|allowed)\b", re.I)
+_TERM_TOKEN = re.compile(r"[\w+#./-]+")
+_MUST_INCLUDE_HEADING = re.compile(r"^[#*\s]*MUST_INCLUDE_DETAILS\b.*$", re.M)
+_BULLET = re.compile(r"^\s*(?:[-*+\u2022]|\d+[.)])\s+(.*)$")
+_QUOTED = re.compile(r"[`'\"\u2018\u201c]([^`'\"\u2019\u201d]{2,60})[`'\"\u2019\u201d]")
+_PARENTHETICAL = re.compile(r"\([^)]*\)")
+
+# More paragraphs than this opening with 'I' or 'My' fail the robot test
+MAX_FIRST_PERSON_PARAGRAPHS = 2
+# As do more 'This resulted in...'-style sentences than this
+MAX_MECHANISM_PHRASES = 1
+# Longer MUST_INCLUDE_DETAILS items are descriptions, not terms, and are left to the LLM checker
+MAX_TERM_TOKENS = 4
+
+def lowercased_tokens(text: str) -> List[str]:
+    """Lowercased word tokens; keeps the punctuation that belongs to technical terms (C++, C#, node.js)."""
+    return [token.strip("./-") for token in _TERM_TOKEN.findall(text.lower())]
+
+@lru_cache(maxsize=64)
+def must_include_terms(blueprint: str) -> FrozenSet[str]:
+    """
+    Exact terms listed under a blueprint's MUST_INCLUDE_DETAILS heading. Quoted terms in a bullet
+    are taken as given; otherwise the bullet is split on commas/semicolons, with parentheticals dropped.
+    """
+    heading = _MUST_INCLUDE_HEADING.search(blueprint)
+    if heading is None:
+        return frozenset()
+
+    terms = set()
+    for line in blueprint[heading.end():].splitlines():
+        if not line.strip():
+            continue
+        bullet = _BULLET.match(line)
+        if bullet is None:
+            # The list ends at the next heading or paragraph
+            break
+
+        item = bullet.group(1)
+        candidates = _QUOTED.findall(item) or re.split(r"[,;]", _PARENTHETICAL.sub("", item))
+        for candidate in candidates:
+            candidate = candidate.strip(" .*:`'\"")
+            if candidate and len(lowercased_tokens(candidate)) <= MAX_TERM_TOKENS:
+                terms.add(candidate)
+    return frozenset(terms)
+
+def specificity_fail(must_include: Iterable[str], letter: str) -> List[str]:
+    """Required terms missing from the letter. Multi-word terms must appear as a contiguous phrase."""
+    tokens = lowercased_tokens(letter)
+    token_set = frozenset(tokens)
+    joined = f" {' '.join(tokens)} "
+
+    missing = []
+    for term in must_include:
+        term_tokens = lowercased_tokens(term)
+        if not term_tokens:
+            continue
+        if len(term_tokens) == 1:
+            present = term_tokens[0] in token_set
+        else:
+            present = f" {' '.join(term_tokens)} " in joined
+        if not present:
+            missing.append(term)
+    return missing
+
+def robot_fail(letter: str) -> List[str]:
+    """Reasons the letter fails the robot test; empty when it passes."""
+    paragraphs = [p for p in PARAGRAPH_BREAK.split(letter.strip()) if p.strip()]
+    reasons = []
+
+    first_person = [i for i, paragraph in enumerate(paragraphs, start=1) if _FIRST_PERSON_START.match(paragraph)]
+    if len(first_person) > MAX_FIRST_PERSON_PARAGRAPHS:
+        reasons.append(
+            f"{len(first_person)} paragraphs ({', '.join(map(str, first_person))}) start with 'I' or 'My'; "
+            f"at most {MAX_FIRST_PERSON_PARAGRAPHS} may. Open the others with a narrative transition."
+        )
+
+    mechanism_count = len(_MECHANISM_PHRASE.findall(letter))
+    if mechanism_count > MAX_MECHANISM_PHRASES:
+        reasons.append(
+            f"{mechanism_count} sentences use 'This resulted in/demonstrated...' mechanism logic; "
+            "replace them with narrative transitions such as 'Building on this foundation...'."
+        )
+    return reasons
@@ -17,16 +17,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
-from langchain_openai import OpenAIEmbeddings
 from langchain_core.messages import HumanMessage
 
-from ragcv.core.loader import DataLoader
+from ragcv.core.loader import DataLoader, get_embeddings
 from ragcv.graph.graph import RouterGraph
 from ragcv.tools.tools import build_registry
 from ragcv.utils.logger import JSONLLogger
 from ragcv.retrieval.enricher import QueryEnricher
 from ragcv.retrieval.retrieval import AdaptiveRetriever
 from ragcv.spec.loader import load_graph_config, load_retrieval_config
+from ragcv.workflows.processor import summary_to_markdown
 
 load_dotenv()
 
@@ -46,7 +46,7 @@ async def lifespan(app: FastAPI):
     
     # 1. Initialize Vectorstore
     loader = DataLoader(data_path="data_real/", db_path="data/db.faiss")
-    embeddings = OpenAIEmbeddings()
+    embeddings = get_embeddings()
     vectorstore = loader.load_vectorstore(embeddings=embeddings)
     documents = loader.get_documents()
 
@@ -103,6 +103,7 @@ async def run_graph_task(task_id: str, input_text: str, retriever: AdaptiveRetri
     os.makedirs("logs", exist_ok=True)
     
     tasks[task_id]["status"] = "processing"
+    task_logger = None
     
     try:
         task_logger = JSONLLogger(log_path=log_path)
@@ -116,12 +117,17 @@ async def run_graph_task(task_id: str, input_text: str, retriever: AdaptiveRetri
             'job_description': HumanMessage(content=input_text),
         }
 
-        # Step 2: Graph Execution
-        final_state = await asyncio.to_thread(graph.invoke, graph_input)
+        # Step 2: Graph Execution (streamed so progress is visible while it runs), on this task's own checkpoint thread
+        def stream_graph():
+            for _, update in graph.stream(graph_input, thread_id=task_id, stream_mode=("updates",)):
+                tasks[task_id]["current_agent"] = next(iter(update), None)
+            return graph.get_final_state(thread_id=task_id)
+
+        final_state = await asyncio.to_thread(stream_graph)
 
         # Step 3: Collect Results
         tasks[task_id]["result"] = final_state.get("document")
-        tasks[task_id]["summary"] = final_state.get("summary")
+        tasks[task_id]["summary"] = summary_to_markdown(final_state.get("summary"))
         tasks[task_id]["status"] = "completed"
         
     except Exception as e:
@@ -129,18 +135,24 @@ async def run_graph_task(task_id: str, input_text: str, retriever: AdaptiveRetri
         tasks[task_id]["error"] = str(e)
         print(f"Task {task_id} failed: {e}")
 
+    finally:
+        if task_logger is not None:
+            task_logger.close()
+
 # =====================================================================
 # API ENDPOINTS
 # =====================================================================
 
 @app.post("/query")
 async def start_query(request: QueryRequest, background_tasks: BackgroundTasks):
-    task_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    # Unique even for requests in the same second; it also names the task's checkpoint thread
+    task_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
     tasks[task_id] = {
         "status": "pending", 
         "result": None, 
         "summary": None, 
         "artifacts": [],
+        "current_agent": None,
         "timestamp": datetime.now().isoformat()
     }
     
@@ -0,0 +1,51 @@
+import time
+import threading
+
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ragcv.core import agent as agent_module
+from ragcv.graph.node import LatencyMonitorCallback
+
+class ScriptedAgent(agent_module.Agent):
+    """Cacheable agent whose LLM call is replaced by `run`."""
+    def __init__(self, run):
+        self.name = "Scripted_Agent"
+        self.model_name = "test-model"
+        self.use_cache = True
+        self._scripted_run = run
+
+    def _run(self, input_data, callbacks=None):
+        return self._scripted_run(input_data)
+
+def test_base_exception_releases_coalesced_waiters():
+    release = threading.Event()
+
+    def interrupted(_):
+        release.wait()
+        raise KeyboardInterrupt
+
+    agent = ScriptedAgent(interrupted)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        owner = pool.submit(agent.invoke, {"query": "interrupt"})
+        time.sleep(0.05)
+        waiter = pool.submit(agent.invoke, {"query": "interrupt"})
+        time.sleep(0.05)
+        release.set()
+
+        with pytest.raises(KeyboardInterrupt):
+            owner.result(timeout=2)
+        with pytest.raises(KeyboardInterrupt):
+            waiter.result(timeout=2)
+
+    assert not agent_module._inflight
+
+def test_reused_response_is_reported_to_callbacks():
+    agent = ScriptedAgent(lambda _: ("response", None))
+    assert agent.invoke({"query": "reuse"}) == ("response", None)
+
+    callback = LatencyMonitorCallback()
+    assert agent.invoke({"query": "reuse"}, callbacks=lambda: callback) == ("response", None)
+    assert callback.metrics["reused_response"] == "cache"
+    assert callback.metrics["token_usage"]["input_tokens"] == 0
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from ragcv.retrieval.bm25 import SparseBM25, tokenize
+
+CORPUS = [
+    "Built PyTorch training pipelines for large language models.",
+    "Led a team of five engineers shipping a recommendation service.",
+    "Researched topological insulators using DFT and Python.",
+    "Python, PyTorch, Kubernetes, and AWS in production.",
+    "Mentored junior engineers; ran code reviews and design reviews.",
+    "Optimised SQL queries and data pipelines for analytics.",
+    "the the the the",
+]
+
+QUERIES = [
+    "pytorch python",
+    "engineers engineers reviews",
+    "topological insulators research",
+    "the",
+    "unseen vocabulary only",
+    "",
+]
+
+@pytest.fixture(scope="module")
+def tokenized_corpus():
+    return [tokenize(text) for text in CORPUS]
+
+@pytest.fixture(scope="module")
+def rank_bm25():
+    # Reference implementation for the parity checks; installed by requirements-dev.txt
+    return pytest.importorskip("rank_bm25")
+
+def test_scores_match_rank_bm25(tokenized_corpus, rank_bm25):
+    sparse = SparseBM25(tokenized_corpus)
+    reference = rank_bm25.BM25Okapi(tokenized_corpus)
+
+    for query in QUERIES:
+        tokens = tokenize(query)
+        np.testing.assert_allclose(sparse.get_scores(tokens), reference.get_scores(tokens), rtol=1e-9, atol=1e-12)
+
+def test_batch_matches_single_queries(tokenized_corpus):
+    sparse = SparseBM25(tokenized_corpus)
+    tokenized_queries = [tokenize(query) for query in QUERIES]
+
+    batch = sparse.get_scores_batch(tokenized_queries)
+    assert batch.shape == (len(QUERIES), len(CORPUS))
+    for row, tokens in zip(batch, tokenized_queries):
+        np.testing.assert_array_equal(row, sparse.get_scores(tokens))
+
+def test_parameters_match_rank_bm25(tokenized_corpus, rank_bm25):
+    sparse = SparseBM25(tokenized_corpus, k1=1.2, b=0.5, epsilon=0.1)
+    reference = rank_bm25.BM25Okapi(tokenized_corpus, k1=1.2, b=0.5, epsilon=0.1)
+
+    tokens = tokenize("python engineers pipelines")
+    np.testing.assert_allclose(sparse.get_scores(tokens), reference.get_scores(tokens), rtol=1e-9)
+
+def test_tokenize_drops_punctuation():
+    assert tokenize("PyTorch, C++ and AWS.") == ["pytorch", "c", "and", "aws"]
@@ -0,0 +1,66 @@
+from ragcv.workflows.qc.lexical import (
+    MAX_FIRST_PERSON_PARAGRAPHS,
+    lowercased_tokens,
+    must_include_terms,
+    robot_fail,
+    specificity_fail,
+)
+
+BLUEPRINT = """OBJECTIVE: Show research depth.
+
+**MUST_INCLUDE_DETAILS:**
+- 'Topological Insulators' (from the thesis)
+- PyTorch, C++; node.js
+- Reduced training time by a third across every production pipeline we ran
+3) Kubernetes (for deployment)
+
+CONTENT_STRATEGY:
+- Lead with the thesis
+"""
+
+def test_lowercased_tokens_keep_technical_punctuation():
+    assert lowercased_tokens("Used C++, C# and Node.js.") == ["used", "c++", "c#", "and", "node.js"]
+
+def test_must_include_terms_parses_the_heading_list():
+    assert must_include_terms(BLUEPRINT) == frozenset(
+        {"Topological Insulators", "PyTorch", "C++", "node.js", "Kubernetes"}
+    )
+
+def test_must_include_terms_without_heading():
+    assert must_include_terms("OBJECTIVE: none\n- PyTorch") == frozenset()
+
+def test_must_include_list_ends_at_next_paragraph():
+    blueprint = "MUST_INCLUDE_DETAILS:\n- PyTorch\n\nNotes follow here.\n- Not a term"
+    assert must_include_terms(blueprint) == frozenset({"PyTorch"})
+
+def test_specificity_fail_reports_missing_terms():
+    letter = "My thesis on topological insulators used PyTorch and C++."
+    missing = specificity_fail(["Topological Insulators", "PyTorch", "C++", "node.js"], letter)
+    assert missing == ["node.js"]
+
+def test_specificity_fail_requires_contiguous_phrases():
+    letter = "Topological methods for insulators."
+    assert specificity_fail(["Topological Insulators"], letter) == ["Topological Insulators"]
+
+def test_specificity_fail_matches_whole_tokens():
+    assert specificity_fail(["Go"], "Good engineering.") == ["Go"]
+
+def test_robot_fail_passes_natural_letter():
+    letter = "Dear team,\n\nI built X.\n\nBuilding on this, my work grew.\n\nMy thanks."
+    assert robot_fail(letter) == []
+
+def test_robot_fail_counts_first_person_openings():
+    paragraphs = ["I did this."] * (MAX_FIRST_PERSON_PARAGRAPHS + 1) + ["Thanks."]
+    reasons = robot_fail("\n\n".join(paragraphs))
+    assert len(reasons) == 1
+    assert reasons[0].startswith(f"{MAX_FIRST_PERSON_PARAGRAPHS + 1} paragraphs (1, 2, 3)")
+
+def test_robot_fail_first_person_needs_a_whole_word():
+    letter = "\n\n".join(["Ideas matter.", "Mystery solved.", "Instead, we shipped.", "Thanks."])
+    assert robot_fail(letter) == []
+
+def test_robot_fail_counts_mechanism_phrases():
+    letter = "We shipped. This resulted in growth. Later, this led to savings."
+    reasons = robot_fail(letter)
+    assert len(reasons) == 1
+    assert reasons[0].startswith("2 sentences")
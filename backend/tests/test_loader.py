@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+from ragcv.core.loader import ANN_MIN_VECTORS, HNSW_EF_SEARCH, build_faiss_index
+
+# Retrieval asks for base_k (15) neighbours per query
+K = 15
+
+def test_small_corpus_uses_exact_index():
+    xb = np.random.default_rng(0).standard_normal((100, 16), dtype=np.float32)
+    assert isinstance(build_faiss_index(xb), faiss.IndexFlatL2)
+
+def test_hnsw_recall_matches_exact_search():
+    rng = np.random.default_rng(0)
+    xb = rng.standard_normal((ANN_MIN_VECTORS, 64), dtype=np.float32)
+    xq = rng.standard_normal((200, 64), dtype=np.float32)
+
+    index = build_faiss_index(xb)
+    assert isinstance(index, faiss.IndexHNSWFlat)
+    assert index.hnsw.efSearch == HNSW_EF_SEARCH >= 4 * K
+
+    exact = faiss.IndexFlatL2(xb.shape[1])
+    exact.add(xb)
+
+    _, approx_ids = index.search(xq, K)
+    _, exact_ids = exact.search(xq, K)
+    recall = np.mean([len(set(a) & set(e)) / K for a, e in zip(approx_ids, exact_ids)])
+    assert recall >= 0.95
@@ -0,0 +1,103 @@
+import pytest
+
+from ragcv.workflows import processor as processor_module
+
+from ragcv.graph import node as node_module
+from ragcv.spec.output_models import QualityCheckerAgentOutputModel
+
+BLUEPRINT = """OBJECTIVE: Land the interview.
+
+MUST_INCLUDE_DETAILS:
+- 'Topological Insulators'
+- PyTorch
+"""
+
+LETTER = "Dear team,\n\nI trained models in PyTorch.\n\nKind regards"
+
+class RecordingLogger:
+    def __init__(self):
+        self.events = []
+        self.invocations = []
+
+    def log_event(self, event_name, event_metadata):
+        self.events.append((event_name, event_metadata))
+
+    def log_agent_invocation(self, **kwargs):
+        self.invocations.append(kwargs)
+
+    def log_agent_error(self, **kwargs):
+        raise AssertionError(f"unexpected agent error: {kwargs}")
+
+class ScriptedQualityChecker:
+    tool_map = {}
+
+    def __init__(self, verdict):
+        self.verdict = verdict
+        self.calls = 0
+
+    def invoke(self, input_data, callbacks=None):
+        self.calls += 1
+        return self.verdict, None
+
+@pytest.fixture
+def make_node(monkeypatch):
+    # Prefix token counting needs a tiktoken download; it only feeds metrics
+    monkeypatch.setattr(node_module, "static_prefix_tokens", lambda name: 0)
+
+    def build(verdict):
+        agent = ScriptedQualityChecker(verdict)
+        logger = RecordingLogger()
+        node = node_module.AgentNodeWrapper(agent, "Quality_Checker_Agent", logger, enricher=None)
+        return node, agent, logger
+    return build
+
+def test_precheck_verdict_skips_the_llm_call(make_node):
+    node, agent, logger = make_node(verdict=None)
+    state = {"task": "Cover Letter", "blueprint": BLUEPRINT, "document": LETTER, "qc_iterations": 0}
+
+    output_state = node(state)
+
+    assert agent.calls == 0
+    assert [name for name, _ in logger.events][0] == "agent_precheck"
+    assert output_state["latest_message"]["status"] == "RETRY"
+    assert "Topological Insulators" in output_state["latest_message"]["specific_fix_instructions"]
+    assert output_state["qc_iterations"] == 1
+
+def test_precheck_retry_keeps_the_previous_score(make_node):
+    node, _, _ = make_node(verdict=None)
+    state = {"task": "Cover Letter", "blueprint": BLUEPRINT, "document": LETTER, "qc_iterations": 1, "qc_score": 3.5}
+
+    assert node(state)["qc_score"] == 3.5
+
+def test_precheck_does_not_apply_to_cvs(make_node):
+    verdict = QualityCheckerAgentOutputModel(
+        status="PASS",
+        score={"specificity": 4, "warmth": 4, "hook": 4},
+    )
+    node, agent, logger = make_node(verdict=verdict)
+    state = {"task": "CV", "blueprint": BLUEPRINT, "document": LETTER, "qc_iterations": 0}
+
+    output_state = node(state)
+
+    assert agent.calls == 1
+    assert len(logger.invocations) == 1
+    assert output_state["latest_message"]["status"] == "PASS"
+    assert output_state["qc_score"] == 4
+
+def test_capped_round_is_left_to_the_llm_checker(make_node, monkeypatch):
+    monkeypatch.setattr(processor_module, "QC_MAX_ITERS", 2)
+    verdict = QualityCheckerAgentOutputModel(
+        status="RETRY",
+        critique="Still generic.",
+        score={"specificity": 2, "warmth": 3, "hook": 3},
+    )
+    node, agent, logger = make_node(verdict=verdict)
+    state = {"task": "Cover Letter", "blueprint": BLUEPRINT, "document": LETTER, "qc_iterations": 2, "qc_score": 2.0}
+
+    output_state = node(state)
+
+    # The precheck would have failed this letter, but the last round must be scored
+    assert agent.calls == 1
+    assert "agent_precheck" not in [name for name, _ in logger.events]
+    assert output_state["latest_message"]["status"] == "PASS"
+    assert output_state["latest_message"]["force_pass_reason"] == "reached 2 revisions"
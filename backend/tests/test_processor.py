@@ -0,0 +1,88 @@
+from ragcv.spec.output_models import CLAgentOutputModel
+from ragcv.workflows import processor as processor_module
+from ragcv.workflows.processor import StateProcessor
+
+DRAFT = "Dear team,\n\nFirst body paragraph.\n  \nSecond body paragraph.\n\nKind regards"
+
+def test_splice_replaces_only_the_named_paragraphs():
+    spliced = StateProcessor._splice_paragraphs(DRAFT, {2: "  New first paragraph.  ", 4: "Best wishes"})
+    assert spliced == "Dear team,\n\nNew first paragraph.\n\nSecond body paragraph.\n\nBest wishes"
+
+def test_splice_ignores_out_of_range_indices(capsys):
+    spliced = StateProcessor._splice_paragraphs(DRAFT, {0: "zero", 5: "past the end", -1: "negative"})
+    assert spliced == "Dear team,\n\nFirst body paragraph.\n\nSecond body paragraph.\n\nKind regards"
+    assert capsys.readouterr().out.count("Dropped revision") == 3
+
+def test_splice_duplicate_indices_keep_the_last_revision():
+    # '2' and '02' both parse to paragraph 2; JSON object semantics keep the later value
+    output = CLAgentOutputModel.model_validate_json('{"revised_paragraphs": {"2": "Earlier.", "02": "Later."}}')
+    spliced = StateProcessor._splice_paragraphs(DRAFT, output.revised_paragraphs)
+    assert spliced.split("\n\n")[1] == "Later."
+    assert spliced.count("Earlier.") == 0
+
+def test_splice_without_previous_draft_orders_revisions():
+    assert StateProcessor._splice_paragraphs(None, {3: "c", 1: " a ", 2: "b"}) == "a\n\nb\n\nc"
+
+def test_revision_request_lists_each_failed_paragraph_once():
+    request = StateProcessor._revision_request({"failed_paragraphs": [3, 2, 3], "document": DRAFT})
+    assert request.startswith("Rewrite only paragraphs [2, 3] of the previous draft")
+
+def test_revision_request_without_draft_asks_for_full_letter():
+    assert StateProcessor._revision_request({"failed_paragraphs": [2]}).startswith("None.")
+
+def test_prepare_output_splices_selective_revision():
+    processor = StateProcessor("CL_Agent", enricher=None)
+    output = CLAgentOutputModel(revised_paragraphs={3: "Rewritten second paragraph."})
+
+    output_state = processor.prepare_output(output, {"document": DRAFT})
+    assert output_state["document"].split("\n\n")[2] == "Rewritten second paragraph."
+
+def _verdict(status, specificity, warmth, hook):
+    return {"kind": "QUALITY_CHECK", "status": status, "score": {"specificity": specificity, "warmth": warmth, "hook": hook}}
+
+def test_quality_gate_keeps_retry_while_scores_improve():
+    verdict = _verdict("RETRY", 4, 3, 3)
+    gate_state = StateProcessor("Quality_Checker_Agent", None)._quality_gate(verdict, {"qc_iterations": 1, "qc_score": 3.0})
+
+    assert verdict["status"] == "RETRY"
+    assert "force_pass_reason" not in verdict
+    assert gate_state == {"qc_iterations": 2, "qc_score": 10 / 3}
+
+def test_quality_gate_forces_pass_at_the_revision_cap(monkeypatch):
+    monkeypatch.setattr(processor_module, "QC_MAX_ITERS", 2)
+    verdict = _verdict("RETRY", 5, 1, 1)
+    gate_state = StateProcessor("Quality_Checker_Agent", None)._quality_gate(verdict, {"qc_iterations": 2, "qc_score": 1.0})
+
+    assert verdict["status"] == "PASS"
+    assert verdict["force_pass_reason"] == "reached 2 revisions"
+    assert gate_state["qc_iterations"] == 3
+
+def test_quality_gate_forces_pass_when_scores_plateau():
+    verdict = _verdict("RETRY", 3, 3, 3)
+    StateProcessor("Quality_Checker_Agent", None)._quality_gate(verdict, {"qc_iterations": 1, "qc_score": 2.95})
+
+    assert verdict["status"] == "PASS"
+    assert verdict["force_pass_reason"] == "score moved 2.95 -> 3.00"
+
+def test_quality_gate_first_round_has_no_plateau_baseline():
+    verdict = _verdict("RETRY", 1, 1, 1)
+    gate_state = StateProcessor("Quality_Checker_Agent", None)._quality_gate(verdict, {"qc_iterations": 0})
+
+    assert verdict["status"] == "RETRY"
+    assert gate_state == {"qc_iterations": 1, "qc_score": 1.0}
+
+def test_quality_gate_leaves_pass_untouched():
+    verdict = _verdict("PASS", 5, 5, 4)
+    StateProcessor("Quality_Checker_Agent", None)._quality_gate(verdict, {"qc_iterations": 5, "qc_score": 5.0})
+
+    assert verdict["status"] == "PASS"
+    assert "force_pass_reason" not in verdict
+
+def test_quality_gate_never_forces_an_unscored_verdict(monkeypatch):
+    monkeypatch.setattr(processor_module, "QC_MAX_ITERS", 2)
+    verdict = {"kind": "QUALITY_CHECK", "status": "RETRY", "score": None}
+    gate_state = StateProcessor("Quality_Checker_Agent", None)._quality_gate(verdict, {"qc_iterations": 2, "qc_score": 3.0})
+
+    assert verdict["status"] == "RETRY"
+    assert "force_pass_reason" not in verdict
+    assert gate_state == {"qc_iterations": 3, "qc_score": 3.0}
@@ -0,0 +1,48 @@
+from ragcv.utils.run_cache import RunCache
+
+STATE = {
+    "document": "Dear team,\n\nHello.",
+    "summary": '{"role":"ML Engineer"}',
+    "task": "Cover Letter",
+    "job_description": "not replayed",
+}
+
+def test_disabled_cache_never_stores_or_replays(tmp_path):
+    cache = RunCache(cache_path=str(tmp_path / "runs.jsonl"), enabled=False)
+    cache.put("query", STATE)
+
+    assert cache.get("query") is None
+    assert not (tmp_path / "runs.jsonl").exists()
+
+def test_env_switch_enables_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("RAGCV_RUN_CACHE", "1")
+    assert RunCache(cache_path=str(tmp_path / "runs.jsonl")).enabled
+
+    monkeypatch.delenv("RAGCV_RUN_CACHE")
+    assert not RunCache(cache_path=str(tmp_path / "runs.jsonl")).enabled
+
+def test_hit_replays_cached_keys_only(tmp_path):
+    cache = RunCache(cache_path=str(tmp_path / "runs.jsonl"), enabled=True)
+    cache.put("Senior  ML\nEngineer", STATE)
+
+    cached = cache.get("Senior ML Engineer")
+    assert cached == {k: STATE[k] for k in ("document", "summary", "task")}
+
+def test_entries_survive_reload(tmp_path):
+    path = str(tmp_path / "runs.jsonl")
+    RunCache(cache_path=path, fingerprint={"graph": "a"}, enabled=True).put("query", STATE)
+
+    assert RunCache(cache_path=path, fingerprint={"graph": "a"}, enabled=True).get("query") is not None
+
+def test_fingerprint_change_misses(tmp_path):
+    path = str(tmp_path / "runs.jsonl")
+    RunCache(cache_path=path, fingerprint={"prompt": "v1", "temperature": 0.6}, enabled=True).put("query", STATE)
+
+    assert RunCache(cache_path=path, fingerprint={"prompt": "v2", "temperature": 0.6}, enabled=True).get("query") is None
+    assert RunCache(cache_path=path, fingerprint={"prompt": "v1", "temperature": 0.0}, enabled=True).get("query") is None
+
+def test_fingerprint_key_order_is_irrelevant(tmp_path):
+    first = RunCache(cache_path=str(tmp_path / "a.jsonl"), fingerprint={"a": 1, "b": 2}, enabled=True)
+    second = RunCache(cache_path=str(tmp_path / "b.jsonl"), fingerprint={"b": 2, "a": 1}, enabled=True)
+
+    assert first.key("query") == second.key("query")